@@ -0,0 +1,3 @@
+# backend/__init__.py - Phoenix Council Elections backend package
+#
+# Import the application factory with ``from backend.app import create_app``.
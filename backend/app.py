@@ -1,40 +1,340 @@
 # app.py - Main Flask application
 
-from flask import Flask, jsonify, request, send_from_directory, session, redirect, url_for, Response
+from flask import Flask, jsonify, request, send_from_directory, send_file, session, redirect, url_for, Response, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from functools import wraps
 import io
 import csv
+import hashlib
+import json
+import tempfile
+import mimetypes
 import os
+import threading
 import uuid
-from config import config
-from utils.data_handler import get_candidates, get_votes, save_votes, get_election_status, save_election_status
-from models import Vote, VotesData, ElectionStatus
-from utils.auth import GoogleAuth, VoterSession
+from .config import config
+from .utils.data_handler import (
+    get_candidates, get_votes, append_vote, get_ballot_ledger, get_election_status, flip_election_status,
+    get_data_version, get_turnout_stats, get_votes_version, get_vote_count, get_votes_page, get_vote_by_id,
+    has_voter_voted, iter_ballot_chunks, get_coselection, DEFAULT_ELECTION_ID, election_exists, get_election,
+    get_election_folder, list_elections, create_election, is_valid_election_id, json_file_reads,
+    iter_vote_chunks, add_leaf_indexes
+)
+from .models import Vote, Election, Candidate
+from .utils.auth import GoogleAuth, VoterSession, SessionTokens
+from .utils.io_pool import IOPool, IOPoolBusy, IOPoolTimeout
+from .utils.ttl_store import TTLStore
+from .utils.assets import AssetPipeline
+from .utils.compression import negotiate_encoding
+from .utils.json_response import JSONResponder
+from .utils.photos import PhotoCache
+from .utils.tally import tally_ballots, rank_results
+from .utils.rate_limit import TokenBucketLimiter, ConcurrencyGate, parse_rate, retry_after_header
+from .utils.request_context import DataContext, DataContextStats
+from .utils.columnar_export import available_formats, write_ballots_arrow, write_ballots_npz
 
 def create_app(config_name='default'):
     app = Flask(__name__, static_folder='../frontend')
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
+    if app.config['PROXY_FIX_X_FOR'] > 0:
+        # request.remote_addr becomes the client address seen by the nearest proxy
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
     # Enable CORS for development
     # Note: Extra spaces in origins list might cause issues, consider trimming if needed.
     CORS(app, origins=['https://majiddaas2.pythonanywhere.com', 'http://127.0.0.1:5001'], supports_credentials=True)
 
-    # Initialize Google OAuth2 and voter session management
+    # Initialize Google OAuth2 and voter session management. Login round-trips
+    # to Google run on their own bounded pool, off the request threads' budget.
+    oauth_pool = None
+    if app.config['OAUTH_POOL_WORKERS'] > 0:
+        oauth_pool = IOPool(
+            workers=app.config['OAUTH_POOL_WORKERS'],
+            max_pending=app.config['OAUTH_MAX_PENDING'],
+            timeout=app.config['OAUTH_TIMEOUT_SECONDS'],
+            name='oauth'
+        )
     google_auth = GoogleAuth(
         client_id=app.config['GOOGLE_CLIENT_ID'],
         client_secret=app.config['GOOGLE_CLIENT_SECRET'],
-        redirect_uri=app.config['GOOGLE_REDIRECT_URI']
+        redirect_uri=app.config['GOOGLE_REDIRECT_URI'],
+        timeout=app.config['OAUTH_TIMEOUT_SECONDS'],
+        pool=oauth_pool,
+        auth_uri=app.config['GOOGLE_AUTH_URI'],
+        token_uri=app.config['GOOGLE_TOKEN_URI'],
+        certs_url=app.config['GOOGLE_CERTS_URL'],
+        userinfo_url=app.config['GOOGLE_USERINFO_URL']
+    )
+    voter_session = VoterSession(
+        ttl=app.config['SESSION_TTL_SECONDS'],
+        idle_ttl=app.config['SESSION_IDLE_SECONDS']
     )
-    voter_session = VoterSession()
+    session_tokens = None
+    if app.config['STATELESS_SESSIONS']:
+        session_tokens = SessionTokens(app.config['SECRET_KEY'], app.config['SESSION_TOKEN_MAX_AGE'])
+    elif app.config['SESSION_SWEEP_INTERVAL'] > 0:
+        voter_session.start_sweeper(app.config['SESSION_SWEEP_INTERVAL'])
 
     # In a real application, use proper authentication (e.g., JWT, sessions)
-    # For demo, we'll keep it simple
-    DEMO_VOTER_IDS = set()
+    # For demo, issued voter IDs live in a TTL store shared by all workers
+    demo_voter_ids = TTLStore(
+        os.path.join(app.config['DATA_FOLDER'], 'voter_ids.sqlite3'),
+        ttl=app.config['VOTER_ID_TTL_SECONDS'],
+        max_entries=app.config['VOTER_ID_MAX_ENTRIES']
+    )
+
+    # Fingerprint and precompress the frontend assets once per start-up
+    asset_pipeline = AssetPipeline(app.static_folder, os.path.join(app.static_folder, 'dist'))
+    try:
+        asset_pipeline.build()
+    except OSError as e:
+        app.logger.error(f"Asset build failed, serving unprocessed frontend files: {e}")
+
+    # Compressed (and, for immutable payloads, cached) JSON responses
+    json_responder = JSONResponder(
+        min_size=app.config['JSON_COMPRESS_MIN_BYTES'],
+        cache_entries=app.config['JSON_CACHE_ENTRIES'],
+        cache_bytes=app.config['JSON_CACHE_MAX_BYTES'],
+        cache_max_body=app.config['JSON_CACHE_MAX_BODY_BYTES']
+    )
+
+    # Local thumbnails of candidate photos, ingested in the background
+    photo_cache = None
+    if app.config['PHOTO_CACHE_ENABLED'] and PhotoCache.available():
+        photo_cache = PhotoCache(
+            app.config['PHOTO_CACHE_FOLDER'],
+            size=app.config['PHOTO_THUMBNAIL_SIZE'],
+            max_bytes=app.config['PHOTO_CACHE_MAX_BYTES']
+        )
+        threading.Thread(
+            target=lambda: photo_cache.ingest_all(
+                c.photo for election in list_elections() for c in get_candidates(election.id)),
+            name='photo-ingest',
+            daemon=True
+        ).start()
+
+    # Admission control for the auth and vote endpoints
+    rate_limiter = TokenBucketLimiter(
+        backend=app.config['RATE_LIMIT_BACKEND'],
+        path=os.path.join(app.config['DATA_FOLDER'], 'rate_limits.sqlite3')
+    )
+    rate_limits = {name: parse_rate(spec) for name, spec in app.config['RATE_LIMITS'].items()}
+    write_gate = ConcurrencyGate(app.config['WRITE_CONCURRENCY_LIMIT'])
+
+    # Responses to vote submissions sent with an Idempotency-Key, for replay
+    idempotency_store = TTLStore(
+        os.path.join(app.config['DATA_FOLDER'], 'idempotency.sqlite3'),
+        ttl=app.config['IDEMPOTENCY_TTL_SECONDS'],
+        max_entries=app.config['IDEMPOTENCY_MAX_ENTRIES']
+    )
+    idempotency_counts = {'replayedTotal': 0, 'conflictTotal': 0}
+    idempotency_lock = threading.Lock()
+
+    # Each request gets a data context (g.data) that loads every data source at
+    # most once; its loads and file reads are tallied per endpoint for metrics
+    data_context_stats = DataContextStats()
+
+    @app.before_request
+    def open_data_context():
+        g.data = DataContext(json_file_reads)
+
+    @app.teardown_request
+    def close_data_context(exc):
+        context = g.pop('data', None)
+        if context is not None and request.endpoint:
+            data_context_stats.record(request.endpoint, context)
 
     # --- Helper Functions ---
 
+    def rate_limited(limit_name, write=False):
+        """
+        Decorator applying the per-client token bucket `limit_name` to a route.
+        With write=True the route also counts against the per-worker cap on
+        concurrent writes. Rejections are cheap 429/503 responses with Retry-After.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not app.config['RATE_LIMIT_ENABLED']:
+                    return func(*args, **kwargs)
+
+                rate, burst = rate_limits[limit_name]
+                # Not access_route: X-Forwarded-For is client-controlled unless ProxyFix vouched for it
+                client = request.remote_addr
+                allowed, retry_after = rate_limiter.acquire(f"{limit_name}:{client}", rate, burst)
+                if not allowed:
+                    response = jsonify({'message': 'Too many requests. Please try again shortly.'})
+                    response.headers['Retry-After'] = retry_after_header(retry_after)
+                    return response, 429
+
+                if not write:
+                    return func(*args, **kwargs)
+                if not write_gate.try_enter():
+                    response = jsonify({'message': 'Server is busy. Please try again shortly.'})
+                    response.headers['Retry-After'] = retry_after_header(1)
+                    return response, 503
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    write_gate.leave()
+            return wrapper
+        return decorator
+
+    def idempotent(func):
+        """
+        Decorator honouring an Idempotency-Key request header. The first request
+        with a key runs the view and, if it succeeds (2xx), its response is
+        stored; later requests with the same key, caller and body get that
+        response back (with Idempotent-Replayed: true) without running the
+        view. A key reused with a different body gets 422, and one whose first
+        request is still running gets 409. Requests without the header are
+        unaffected. Apply it outside rate_limited so replays stay cheap.
+        """
+        # A claimed key whose request never finished (e.g. the worker died) frees up after this
+        pending_seconds = 60
+
+        def count(name):
+            with idempotency_lock:
+                idempotency_counts[name] += 1
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            client_key = request.headers.get('Idempotency-Key')
+            if client_key is None:
+                return func(*args, **kwargs)
+            if not 0 < len(client_key) <= 255:
+                return jsonify({'message': 'Idempotency-Key must be 1 to 255 characters'}), 400
+
+            voter_info = current_voter()
+            key = '\x1f'.join((request.path, voter_info['user_id'] if voter_info else '', client_key))
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+            if not idempotency_store.add(key, json.dumps({'fingerprint': fingerprint}), ttl=pending_seconds):
+                stored = idempotency_store.get(key)
+                record = json.loads(stored) if stored else {'fingerprint': fingerprint}
+                if record['fingerprint'] != fingerprint:
+                    count('conflictTotal')
+                    return jsonify({'message': 'Idempotency-Key was already used for a different request'}), 422
+                if 'status' not in record:
+                    count('conflictTotal')
+                    response = jsonify({'message': 'A request with this Idempotency-Key is still in progress'})
+                    response.headers['Retry-After'] = retry_after_header(1)
+                    return response, 409
+                count('replayedTotal')
+                response = Response(record['body'], status=record['status'], mimetype=record['mimetype'])
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+
+            try:
+                response = app.make_response(func(*args, **kwargs))
+            except Exception:
+                idempotency_store.delete(key)
+                raise
+            if 200 <= response.status_code < 300:
+                idempotency_store.put(key, json.dumps({
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'mimetype': response.mimetype,
+                    'body': response.get_data(as_text=True)
+                }))
+            else:
+                # Failures are not remembered: a retry runs the view again
+                idempotency_store.delete(key)
+            return response
+        return wrapper
+
+    def with_local_photo(candidate):
+        """Point a candidate dict at its cached thumbnail, when there is one."""
+        if photo_cache is None:
+            return candidate
+        local_url = photo_cache.local_url(candidate.get('photo'))
+        return {**candidate, 'photo': local_url} if local_url else candidate
+
+    def send_built_asset(relative_path, immutable):
+        """
+        Serve a file produced by the asset pipeline, picking the precompressed
+        copy the client accepts. Returns None if the file was not built.
+        """
+        resolved = asset_pipeline.resolve(relative_path, negotiate_encoding(request.accept_encodings))
+        if resolved is None:
+            return None
+        file_path, encoding = resolved
+        response = send_file(file_path, mimetype=mimetypes.guess_type(relative_path)[0], conditional=True, etag=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        if immutable:
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    # Parsed candidate lists per election, each reloaded only when that
+    # election's candidates.json (or the photo cache) changes
+    candidates_cache = {}
+
+    def cached_candidates_payload(election_id):
+        """Return an election's candidate list as dicts (with local photo URLs), from memory when unchanged."""
+        key = (get_data_version('candidates.json', election_id), photo_cache.generation if photo_cache else None)
+        cached = candidates_cache.get(election_id)
+        if cached is None or cached[0] != key:
+            cached = (key, [with_local_photo(c.to_dict()) for c in request_candidates(election_id)])
+            candidates_cache[election_id] = cached
+        return cached[1]
+
+    def request_candidates(election_id):
+        """An election's candidates, loaded at most once per request."""
+        return g.data.get('candidates', get_candidates, election_id)
+
+    def request_election(election_id):
+        """An election's settings, loaded at most once per request."""
+        return g.data.get('election', get_election, election_id)
+
+    def request_status(election_id):
+        """An election's status as of its first use in this request."""
+        return g.data.get('status', get_election_status, election_id)
+
+    def session_credential():
+        """Return the credential stored in the Flask session (signed token or session ID)."""
+        if session_tokens is not None:
+            return session.get('voter_token')
+        return session.get('voter_session_id')
+
+    def lookup_voter(credential):
+        """Resolve a session credential to voter info, or None if it is invalid or expired."""
+        if session_tokens is not None:
+            return session_tokens.verify(credential)  # Signature check only, no I/O
+        return voter_session.get_session(credential)
+
+    def current_voter():
+        """Voter info for this request's session credential (None if absent or invalid), resolved once."""
+        credential = session_credential()
+        if not credential:
+            return None
+        return g.data.get('voter', lookup_voter, credential)
+
+    def user_has_voted(user_id, election_id=DEFAULT_ELECTION_ID):
+        """Check whether a user has already voted in an election."""
+        if session_tokens is not None or election_id != DEFAULT_ELECTION_ID:
+            # Tokens carry no voting state, and server-side sessions only track
+            # the default election; otherwise the vote store is authoritative
+            return has_voter_voted(user_id, election_id)
+        return voter_session.has_voted(user_id)
+
+    def voter_has_voted(voter_info, election_id=DEFAULT_ELECTION_ID):
+        """Check whether the voter behind a resolved session has already voted in an election."""
+        if session_tokens is not None or election_id != DEFAULT_ELECTION_ID:
+            return user_has_voted(voter_info['user_id'], election_id)
+        return voter_info['has_voted']
+
+    def start_voter_session(user_id, email, name, is_admin=False):
+        """Log a voter in, storing either a signed token or a server-side session ID."""
+        if session_tokens is not None:
+            session['voter_token'] = session_tokens.issue(user_id, email, name, is_admin=is_admin)
+        else:
+            session['voter_session_id'] = voter_session.create_session(user_id, email, name, is_admin=is_admin)
+
     def require_admin(func):
         """
         Decorator to require admin access for a route.
@@ -42,11 +342,11 @@ def create_app(config_name='default'):
         """
         @wraps(func) # Preserves original function metadata
         def wrapper(*args, **kwargs):
-            session_id = session.get('voter_session_id')
+            session_id = session_credential()
             if not session_id:
                 return jsonify({'message': 'Authentication required'}), 401
 
-            voter_info = voter_session.get_session(session_id)
+            voter_info = current_voter()
             # Check if voter_info exists and if is_admin is True
             if not voter_info or not voter_info.get('is_admin', False):
                 user_email = voter_info.get('email') if voter_info else 'Unknown'
@@ -57,36 +357,101 @@ def create_app(config_name='default'):
             return func(*args, **kwargs)
         return wrapper
 
+    def election_payload(election):
+        """Public description of an election and its ballot rules."""
+        return {
+            'id': election.id,
+            'title': election.title,
+            'maxSelections': election.max_selections,
+            'maxExecutives': election.max_executives
+        }
+
+    def election_route(rule, **options):
+        """
+        Register an election-scoped API route twice: /api<rule> for the default
+        election and /api/elections/<election_id><rule> for any other. The view
+        gets election_id as a keyword argument; unknown elections get a 404.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, election_id, **kwargs):
+                if not election_exists(election_id):
+                    return jsonify({'message': 'Election not found'}), 404
+                return func(*args, election_id=election_id, **kwargs)
+            app.route(f'/api{rule}', defaults={'election_id': DEFAULT_ELECTION_ID}, **options)(wrapper)
+            app.route(f'/api/elections/<election_id>{rule}', **options)(wrapper)
+            return wrapper
+        return decorator
+
     # --- API Routes ---
 
     # Serve static files from the frontend folder
+    # Built (fingerprinted + precompressed) files are preferred; the original
+    # files remain reachable under their plain names as a fallback.
     @app.route('/')
     def serve_index():
-        return send_from_directory(app.static_folder, 'index.html')
+        return send_built_asset('index.html', immutable=False) or send_from_directory(app.static_folder, 'index.html')
 
     @app.route('/css/<path:filename>')
     def serve_css(filename):
-        return send_from_directory(os.path.join(app.static_folder, 'css'), filename)
+        return (send_built_asset(f'css/{filename}', immutable=True) or
+                send_from_directory(os.path.join(app.static_folder, 'css'), filename))
 
     @app.route('/js/<path:filename>')
     def serve_js(filename):
-        return send_from_directory(os.path.join(app.static_folder, 'js'), filename)
+        return (send_built_asset(f'js/{filename}', immutable=True) or
+                send_from_directory(os.path.join(app.static_folder, 'js'), filename))
+
+    # @desc    Serve a cached candidate photo thumbnail
+    # @route   GET /photos/<key>
+    # @access  Public
+    @app.route('/photos/<key>')
+    def serve_photo(key):
+        if photo_cache is None or not all(ch in '0123456789abcdef' for ch in key):
+            return jsonify({'message': 'Photo not found'}), 404
+        resolved = photo_cache.resolve(key, request.accept_mimetypes)
+        if resolved is None:
+            # Evicted or not ingested yet: fall back to the original image
+            source_url = photo_cache.source_url(key)
+            if source_url:
+                return redirect(source_url)
+            return jsonify({'message': 'Photo not found'}), 404
+        file_path, mimetype = resolved
+        response = send_file(file_path, mimetype=mimetype, conditional=True, etag=True)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        response.headers['Vary'] = 'Accept'
+        return response
+
+    # @desc    List elections with their ballot rules and status
+    # @route   GET /api/elections
+    # @access  Public
+    @app.route('/api/elections', methods=['GET'])
+    def get_elections():
+        try:
+            return jsonify({
+                'defaultElection': DEFAULT_ELECTION_ID,
+                'elections': [
+                    {**election_payload(election), 'isOpen': request_status(election.id).is_open}
+                    for election in list_elections()
+                ]
+            }), 200
+        except Exception as e:
+            app.logger.error(f"Error listing elections: {e}")
+            return jsonify({'message': 'Server error'}), 500
 
     # @desc    Get all candidates
     # @route   GET /api/candidates
     # @access  Public
-    @app.route('/api/candidates', methods=['GET'])
-    def get_all_candidates():
+    @election_route('/candidates', methods=['GET'])
+    def get_all_candidates(election_id):
         """
         API endpoint to get all candidates.
         Reads data from backend/data/candidates.json and returns it as JSON.
         """
         try:
-            # --- Construct the path to the candidates.json file ---
-            # Assumes this file (app.py) is in the backend/ directory
-            # and data/ is a subdirectory of backend/
-            backend_dir = os.path.dirname(os.path.abspath(__file__))
-            data_dir = os.path.join(backend_dir, 'data')
+            # --- Construct the path to the election's candidates.json file ---
+            # (backend/data/ for the default election, backend/data/elections/<id>/ otherwise)
+            data_dir = get_election_folder(election_id)
             candidates_file_path = os.path.join(data_dir, 'candidates.json')
 
             # --- Check if the file exists ---
@@ -94,6 +459,13 @@ def create_app(config_name='default'):
                 app.logger.error(f"Candidates file not found at {candidates_file_path}")
                 return jsonify({"message": "Candidates data file not found on server."}), 404
 
+            # --- Serve the encoded payload from cache while the file is unchanged ---
+            cache_key = ('candidates', election_id, get_data_version('candidates.json', election_id),
+                         photo_cache.generation if photo_cache else None)
+            cached = json_responder.cached(cache_key)
+            if cached is not None:
+                return cached
+
             # --- Read the JSON data from the file ---
             import json  # Ensure json is imported locally if needed
             with open(candidates_file_path, 'r') as f:
@@ -106,7 +478,8 @@ def create_app(config_name='default'):
 
             # --- Return the data as a JSON response ---
             # 200 OK is the default status code
-            return jsonify(candidates_data)
+            candidates_data = [with_local_photo(c) if isinstance(c, dict) else c for c in candidates_data]
+            return json_responder.respond(candidates_data, cache_key=cache_key)
 
         except json.JSONDecodeError as e:
             # Handle case where the JSON file is malformed
@@ -117,11 +490,48 @@ def create_app(config_name='default'):
             app.logger.error(f"Unexpected error fetching candidates: {e}")
             return jsonify({"message": "An internal server error occurred while fetching candidates."}), 500
 
+    # @desc    Everything the frontend needs for its first render
+    # @route   GET /api/bootstrap
+    # @access  Public
+    @election_route('/bootstrap', methods=['GET'])
+    def bootstrap(election_id):
+        """
+        Candidate catalog, session state and election status in one response,
+        replacing the separate candidates/session/status requests on page load.
+        Each source is read once, from cached state where possible.
+        """
+        try:
+            session_state = {'authenticated': False}
+            voter_info = current_voter()
+            if voter_info:
+                session_state = {
+                    'authenticated': True,
+                    'user': {
+                        'name': voter_info['name'],
+                        'email': voter_info['email']
+                    },
+                    'hasVoted': voter_has_voted(voter_info, election_id),
+                    'isAdmin': voter_info.get('is_admin', False)
+                }
+
+            return json_responder.respond({
+                'candidates': cached_candidates_payload(election_id),
+                'session': session_state,
+                'election': {
+                    **election_payload(request_election(election_id)),
+                    'isOpen': request_status(election_id).is_open
+                }
+            })
+        except Exception as e:
+            app.logger.error(f"Error building bootstrap payload: {e}")
+            return jsonify({'message': 'An internal server error occurred while loading the page data.'}), 500
+
     # @desc    Request a voter ID (simulated)
     # @route   POST /api/votes/request-id
     # @access  Public
-    @app.route('/api/votes/request-id', methods=['POST'])
-    def request_voter_id():
+    @election_route('/votes/request-id', methods=['POST'])
+    @rate_limited('request_id', write=True)
+    def request_voter_id(election_id):
         data = request.get_json()
         email = data.get('email')
         phone_last4 = data.get('phoneLast4')
@@ -136,13 +546,13 @@ def create_app(config_name='default'):
         if len(phone_last4) != 4 or not phone_last4.isdigit():
             return jsonify({'message': 'Phone last 4 digits must be 4 numbers'}), 400
 
-        election_status = get_election_status()
+        election_status = request_status(election_id)
         if not election_status.is_open:
             return jsonify({'message': 'Election is currently closed'}), 400
 
         # Generate a unique voter ID (in a real app, send via email)
         voter_id = f"VOTER_{uuid.uuid4().hex[:8].upper()}"
-        DEMO_VOTER_IDS.add(voter_id)  # Store for verification
+        demo_voter_ids.put(voter_id)  # Store for verification
 
         # In a real app, you would send an email here
         app.logger.info(f"[DEMO] Sending Voter ID {voter_id} to {email}")
@@ -155,25 +565,24 @@ def create_app(config_name='default'):
     # @desc    Verify a voter ID
     # @route   POST /api/votes/verify-id
     # @access  Public
-    @app.route('/api/votes/verify-id', methods=['POST'])
-    def verify_voter_id():
+    @election_route('/votes/verify-id', methods=['POST'])
+    def verify_voter_id(election_id):
         data = request.get_json()
         voter_id = data.get('voterId')
 
         if not voter_id:
             return jsonify({'message': 'Voter ID is required'}), 400
 
-        election_status = get_election_status()
+        election_status = request_status(election_id)
         if not election_status.is_open:
             return jsonify({'message': 'Election is currently closed'}), 400
 
         # Check if voter ID exists (demo logic)
-        if voter_id not in DEMO_VOTER_IDS:
+        if voter_id not in demo_voter_ids:
             return jsonify({'message': 'Invalid voter ID'}), 400
 
         # Check if voter ID has already been used
-        votes_data = get_votes()
-        if voter_id in votes_data.voter_ids:
+        if has_voter_voted(voter_id, election_id):
             return jsonify({'message': 'This voter ID has already been used'}), 400
 
         return jsonify({'message': 'Voter ID verified successfully'}), 200
@@ -181,18 +590,20 @@ def create_app(config_name='default'):
     # @desc    Submit a vote
     # @route   POST /api/votes/submit
     # @access  Authenticated
-    @app.route('/api/votes/submit', methods=['POST'])
-    def submit_vote():
+    @election_route('/votes/submit', methods=['POST'])
+    @idempotent
+    @rate_limited('submit', write=True)
+    def submit_vote(election_id):
         # Check authentication
-        session_id = session.get('voter_session_id')
+        session_id = session_credential()
         voter_info = None
 
         if session_id:
-            voter_info = voter_session.get_session(session_id)
+            voter_info = current_voter()
             if not voter_info:
                 return jsonify({'message': 'Invalid session'}), 401
 
-            if voter_info['has_voted']:
+            if voter_has_voted(voter_info, election_id):
                 return jsonify({'message': 'You have already voted'}), 400
         else:
             # Demo mode - create a demo user
@@ -205,8 +616,10 @@ def create_app(config_name='default'):
         data = request.get_json()
         selected_candidates = data.get('selectedCandidates')
         executive_candidates = data.get('executiveCandidates')
-        MAX_SELECTIONS = 15
-        MAX_EXECUTIVES = 7
+        # Ballot rules are per election (election.json, defaults in Config)
+        election = request_election(election_id)
+        MAX_SELECTIONS = election.max_selections
+        MAX_EXECUTIVES = election.max_executives
 
         if not selected_candidates or not executive_candidates:
             return jsonify({'message': 'Selected candidates and executive candidates are required'}), 400
@@ -220,7 +633,7 @@ def create_app(config_name='default'):
         # Validate candidate IDs (assuming get_candidates returns objects with an 'id' attribute)
         # This part might need adjustment based on your Candidate model's structure
         try:
-            candidate_objects = get_candidates()
+            candidate_objects = request_candidates(election_id)
             candidate_ids = [c.id for c in candidate_objects]
         except AttributeError:
              app.logger.error("Candidate objects do not have an 'id' attribute.")
@@ -235,7 +648,7 @@ def create_app(config_name='default'):
         if invalid_selected or invalid_executives:
             return jsonify({'message': 'Invalid candidate ID provided'}), 400
 
-        election_status = get_election_status()
+        election_status = request_status(election_id)
         if not election_status.is_open:
             return jsonify({'message': 'Election is currently closed'}), 400
 
@@ -248,46 +661,55 @@ def create_app(config_name='default'):
             timestamp=__import__('datetime').datetime.utcnow().isoformat() + 'Z'
         )
 
-        votes_data = get_votes()
-        votes_data.votes.append(new_vote)
-        votes_data.voter_ids.append(voter_info['user_id'])
-
-        if not save_votes(votes_data):
+        # Sessions expire, so the vote store is the authoritative record of who voted
+        if has_voter_voted(voter_info['user_id'], election_id):
+            return jsonify({'message': 'You have already voted'}), 400
+        if not append_vote(new_vote, election_id):
+            if has_voter_voted(voter_info['user_id'], election_id):
+                # Lost a race with a concurrent submit from the same voter
+                return jsonify({'message': 'You have already voted'}), 400
             return jsonify({'message': 'Failed to save vote'}), 500
 
-        # Mark voter as having voted (only if authenticated)
-        if session_id:
+        # Mark voter as having voted (only for server-side sessions; with
+        # signed tokens the vote store itself records it)
+        if session_id and session_tokens is None and election_id == DEFAULT_ELECTION_ID:
             voter_session.mark_voted(session_id)
 
-        return jsonify({'message': 'Vote submitted successfully'}), 200
+        # The vote ID doubles as a receipt for /api/audit/proof/<vote_id>
+        return jsonify({'message': 'Vote submitted successfully', 'voteId': new_vote.id}), 200
 
     # @desc    Get election results
     # @route   GET /api/results
     # @access  Public
-    @app.route('/api/results', methods=['GET'])
-    def get_results():
-        election_status = get_election_status()
-        candidates = get_candidates()
-        votes_data = get_votes()
+    @election_route('/results', methods=['GET'])
+    def get_results(election_id):
+        election_status = request_status(election_id)
+
+        # Final results only change when the data files do
+        cache_key = None
+        if not election_status.is_open:
+            cache_key = ('results', election_id, get_votes_version(election_id),
+                         get_data_version('candidates.json', election_id),
+                         photo_cache.generation if photo_cache else None)
+            cached = json_responder.cached(cache_key)
+            if cached is not None:
+                return cached
 
         if election_status.is_open:
+            # Served from shared counters: no candidate or ballot data is loaded
             return jsonify({
                 'message': 'Election is open. Results are not available yet.',
                 'isOpen': True,
-                'stats': {
-                    'totalCandidates': len(candidates),
-                    'totalVotes': len(votes_data.votes)
-                }
+                'stats': get_turnout_stats(election_id),
+                'integrity': get_ballot_ledger(election_id).summary()
             }), 200
 
+        candidates = request_candidates(election_id)
+
         # Calculate results
         # Ensure candidates have a to_dict() method or adjust accordingly
         try:
-            results = {c.id: {
-                **c.to_dict(), # Requires Candidate model to have to_dict()
-                'councilVotes': 0,
-                'executiveVotes': 0
-            } for c in candidates}
+            candidate_dicts = [with_local_photo(c.to_dict()) for c in candidates] # Requires Candidate model to have to_dict()
         except AttributeError:
              app.logger.error("Candidate objects do not have a 'to_dict' method.")
              return jsonify({'message': 'Server configuration error: Candidate data invalid for results.'}), 500
@@ -296,27 +718,36 @@ def create_app(config_name='default'):
              return jsonify({'message': 'Server error while calculating results.'}), 500
 
 
-        for vote in votes_data.votes:
-            for id in vote.selected_candidates:
-                if id in results:
-                    results[id]['councilVotes'] += 1
-            for id in vote.executive_candidates:
-                if id in results:
-                    results[id]['executiveVotes'] += 1
-
-        # Convert to array and sort
-        results_array = list(results.values())
-        # Sort by council votes DESC, then executive votes DESC
-        results_array.sort(key=lambda x: (x['councilVotes'], x['executiveVotes']), reverse=True)
+        # Same counting rules as the offline recount (backend/recount.py)
+        council, executive, total_votes = tally_ballots(
+            ballot for chunk in iter_ballot_chunks(election_id=election_id) for ballot in chunk
+        )
+        results_array = rank_results(candidate_dicts, council, executive)
 
-        return jsonify({
+        return json_responder.respond({
             'isOpen': False,
             'results': results_array,
             'stats': {
                 'totalCandidates': len(candidates),
-                'totalVotes': len(votes_data.votes)
-            }
-        }), 200
+                'totalVotes': total_votes
+            },
+            'integrity': get_ballot_ledger(election_id).summary()
+        }, cache_key=cache_key)
+
+    # @desc    Merkle inclusion proof for a ballot
+    # @route   GET /api/audit/proof/<vote_id>
+    # @access  Public
+    @election_route('/audit/proof/<vote_id>', methods=['GET'])
+    def get_inclusion_proof(vote_id, election_id):
+        """
+        Proof that a ballot is included under the current Merkle root (see
+        integrity.merkleRoot in /api/results). Verify with
+        backend.utils.merkle.verify_inclusion, hashing the ballot's canonical JSON.
+        """
+        proof = get_ballot_ledger(election_id).inclusion_proof(vote_id)
+        if proof is None:
+            return jsonify({'message': 'Vote not found'}), 404
+        return jsonify(proof), 200
 
     # @desc    Authenticate admin (Password-based - kept for potential legacy/backup use)
     # @route   POST /api/admin/auth
@@ -338,11 +769,11 @@ def create_app(config_name='default'):
     # @desc    Get election status
     # @route   GET /api/admin/status
     # @access  Admin (protected by require_admin)
-    @app.route('/api/admin/status', methods=['GET'])
+    @election_route('/admin/status', methods=['GET'])
     @require_admin
-    def get_admin_status():
+    def get_admin_status(election_id):
         try:
-            status = get_election_status()
+            status = request_status(election_id)
             return jsonify(status.to_dict()), 200
         except Exception as err:
             app.logger.error(f"Error getting admin status: {err}")
@@ -351,13 +782,13 @@ def create_app(config_name='default'):
     # @desc    Toggle election status
     # @route   POST /api/admin/toggle
     # @access  Admin (protected by require_admin)
-    @app.route('/api/admin/toggle', methods=['POST'])
+    @election_route('/admin/toggle', methods=['POST'])
     @require_admin
-    def toggle_election_status():
+    def toggle_election_status(election_id):
         try:
-            current_status = get_election_status()
-            new_status = ElectionStatus(is_open=not current_status.is_open)
-            if save_election_status(new_status):
+            new_status = flip_election_status(election_id)
+            g.data.invalidate('status', election_id)
+            if new_status is not None:
                 return jsonify({
                     'message': f"Election is now {'open' if new_status.is_open else 'closed'}",
                     'isOpen': new_status.is_open
@@ -368,16 +799,86 @@ def create_app(config_name='default'):
             app.logger.error(f"Error toggling election status: {err}")
             return jsonify({'message': 'Server error'}), 500
 
-    # @desc    Export votes (simplified JSON)
+    # @desc    Create an election. Body: {id, title, maxSelections, maxExecutives,
+    #          candidates: [...], isOpen}; only id is required. New elections
+    #          start closed unless isOpen is true.
+    # @route   POST /api/admin/elections
+    # @access  Admin (protected by require_admin)
+    @app.route('/api/admin/elections', methods=['POST'])
+    @require_admin
+    def add_election():
+        data = request.get_json(silent=True) or {}
+        election_id = str(data.get('id') or '')
+        if not is_valid_election_id(election_id):
+            return jsonify({'message': 'Election id must be 1-64 lowercase letters, digits, "-" or "_"'}), 400
+        if election_exists(election_id):
+            return jsonify({'message': 'Election already exists'}), 409
+        candidates = data.get('candidates') or []
+        if not isinstance(candidates, list) or not all(isinstance(c, dict) for c in candidates):
+            return jsonify({'message': 'candidates must be a list of candidate objects'}), 400
+        # Stored candidates are loaded with Candidate(**item), so reject anything that would not load
+        try:
+            candidates = [Candidate(**item).to_dict() for item in candidates]
+        except TypeError:
+            return jsonify({'message': 'Each candidate needs exactly: id, name, position, photo, activity, bio'}), 400
+        # Ids index the co-selection matrix and the columnar export's int32 column
+        ids = [c['id'] for c in candidates]
+        if not all(isinstance(cid, int) and not isinstance(cid, bool) for cid in ids):
+            return jsonify({'message': 'Candidate ids must be integers'}), 400
+        if len(set(ids)) != len(ids):
+            return jsonify({'message': 'Candidate ids must be unique'}), 400
+        try:
+            max_selections = data.get('maxSelections')
+            max_executives = data.get('maxExecutives')
+            election = Election(
+                id=election_id,
+                title=str(data.get('title') or election_id),
+                max_selections=int(app.config['MAX_SELECTIONS'] if max_selections is None else max_selections),
+                max_executives=int(app.config['MAX_EXECUTIVES'] if max_executives is None else max_executives)
+            )
+        except (TypeError, ValueError):
+            return jsonify({'message': 'maxSelections and maxExecutives must be integers'}), 400
+        if election.max_selections < 1 or election.max_executives < 1:
+            return jsonify({'message': 'maxSelections and maxExecutives must be at least 1'}), 400
+        if not create_election(election, candidates, is_open=bool(data.get('isOpen', False))):
+            return jsonify({'message': 'Failed to create election'}), 500
+        return jsonify({**election_payload(election), 'isOpen': bool(data.get('isOpen', False))}), 201
+
+    # @desc    Export votes (simplified JSON). With ?cursor= and/or ?limit= the
+    #          ballots are returned one page at a time in timestamp order; pass
+    #          nextCursor back to get the following page (null on the last one).
     # @route   GET /api/admin/export
     # @access  Admin (protected by require_admin)
-    @app.route('/api/admin/export', methods=['GET'])
+    @election_route('/admin/export', methods=['GET'])
     @require_admin
-    def export_votes():
+    def export_votes(election_id):
         try:
-            votes_data = get_votes()
+            if 'cursor' in request.args or 'limit' in request.args:
+                try:
+                    limit = int(request.args.get('limit') or app.config['EXPORT_PAGE_SIZE'])
+                    if limit < 1:
+                        raise ValueError('limit must be at least 1')
+                    # Ballots are append-only, so a page never changes once written
+                    limit = min(limit, app.config['EXPORT_PAGE_MAX'])
+                    votes, next_cursor = get_votes_page(request.args.get('cursor'), limit, election_id)
+                except ValueError as err:
+                    return jsonify({'message': f'Invalid cursor or limit: {err}'}), 400
+                return json_responder.respond({
+                    'votes': add_leaf_indexes(votes, election_id),
+                    'nextCursor': next_cursor,
+                    'total': get_vote_count(election_id)
+                })
+
+            # The ledger can trail the vote log (another worker mid-commit), so key on both
+            tree_size = get_ballot_ledger(election_id).summary()['treeSize']
+            cache_key = ('export', election_id, get_votes_version(election_id), tree_size)
+            cached = json_responder.cached(cache_key)
+            if cached is not None:
+                return cached
+            votes_data = get_votes(election_id).to_dict() # Requires VotesData model to have to_dict()
+            add_leaf_indexes(votes_data['votes'], election_id)
             # In a real app, you might want to format this differently or use a file response
-            return jsonify(votes_data.to_dict()), 200 # Requires VotesData model to have to_dict()
+            return json_responder.respond(votes_data, cache_key=cache_key)
         except AttributeError:
              app.logger.error("VotesData object does not have a 'to_dict' method.")
              return jsonify({'message': 'Server configuration error: Vote data invalid for export.'}), 500
@@ -385,6 +886,76 @@ def create_app(config_name='default'):
             app.logger.error(f"Error exporting votes (JSON): {err}")
             return jsonify({'message': 'Server error'}), 500
 
+    # @desc    Look up a single ballot by vote ID
+    # @route   GET /api/admin/votes/<vote_id>
+    # @access  Admin (protected by require_admin)
+    @election_route('/admin/votes/<vote_id>', methods=['GET'])
+    @require_admin
+    def get_vote(vote_id, election_id):
+        vote = get_vote_by_id(vote_id, election_id)
+        if vote is None:
+            return jsonify({'message': 'Vote not found'}), 404
+        return jsonify(vote), 200
+
+    # @desc    Candidates most often chosen together: for each candidate, the
+    #          top ?k= (default 5) council running mates and executive picks
+    #          among its voters. ?candidate=<id> limits it to one candidate.
+    # @route   GET /api/admin/analytics/coselection
+    # @access  Admin (protected by require_admin)
+    @election_route('/admin/analytics/coselection', methods=['GET'])
+    @require_admin
+    def get_coselection_analytics(election_id):
+        try:
+            k = int(request.args.get('k') or 5)
+            candidate_id = request.args.get('candidate')
+            candidate_id = int(candidate_id) if candidate_id else None
+        except ValueError:
+            return jsonify({'message': 'k and candidate must be integers'}), 400
+        if k < 1:
+            return jsonify({'message': 'k must be at least 1'}), 400
+
+        cache_key = ('coselection', election_id, get_votes_version(election_id),
+                     get_data_version('candidates.json', election_id), k, candidate_id)
+        cached = json_responder.cached(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            matrix = get_coselection(election_id=election_id)
+            if matrix is None:
+                return jsonify({'message': 'Co-selection analytics require NumPy on the server'}), 503
+            names = {c.id: c.name for c in request_candidates(election_id)}
+            rows = matrix.top_pairs(k, candidate_id)
+        except Exception as err:
+            app.logger.error(f"Error computing co-selection analytics for {election_id}: {err}")
+            return jsonify({'message': 'Co-selection analytics are unavailable for this election'}), 503
+        if candidate_id is not None and not rows:
+            return jsonify({'message': 'Candidate not found'}), 404
+        for row in rows:
+            row['name'] = names.get(row['id'])
+            for pair in row['council'] + row['executive']:
+                pair['name'] = names.get(pair['id'])
+        return json_responder.respond({
+            'totalVotes': matrix.ballots,
+            'k': k,
+            'candidates': rows
+        }, cache_key=cache_key)
+
+    # @desc    Runtime metrics (sessions, rate limiting, OAuth pool, data reads, idempotent replays)
+    # @route   GET /api/admin/metrics
+    # @access  Admin (protected by require_admin)
+    @app.route('/api/admin/metrics', methods=['GET'])
+    @require_admin
+    def get_metrics():
+        return jsonify({
+            'sessions': voter_session.stats(),
+            'rateLimit': rate_limiter.stats(),
+            'writeConcurrency': write_gate.stats(),
+            'oauthPool': oauth_pool.stats() if oauth_pool else None,
+            'dataReads': data_context_stats.stats(),
+            'idempotency': {'entries': len(idempotency_store), **idempotency_counts}
+        }), 200
+
     # --- Google OAuth2 Routes ---
 
     # @desc    Initiate Google OAuth2 login
@@ -414,6 +985,7 @@ def create_app(config_name='default'):
     # @route   GET /auth/google/callback
     # @access  Public
     @app.route('/auth/google/callback')
+    @rate_limited('auth')
     def google_callback():
         try:
             code = request.args.get('code')
@@ -422,15 +994,18 @@ def create_app(config_name='default'):
             if not code:
                 return jsonify({'message': 'Authorization code not received'}), 400
 
-            # Exchange code for tokens
-            tokens = google_auth.exchange_code_for_tokens(code)
-            if not tokens:
-                return jsonify({'message': 'Failed to exchange authorization code'}), 400
-
-            # Verify ID token
-            user_info = google_auth.verify_id_token(tokens['id_token'])
+            # Exchange code for tokens and verify the ID token (on the OAuth pool)
+            try:
+                user_info, error = google_auth.authenticate(code)
+            except IOPoolBusy:
+                response = jsonify({'message': 'Too many sign-ins in progress. Please try again shortly.'})
+                response.headers['Retry-After'] = retry_after_header(1)
+                return response, 503
+            except IOPoolTimeout:
+                app.logger.warning("Google sign-in timed out")
+                return jsonify({'message': 'Google sign-in timed out. Please try again.'}), 504
             if not user_info:
-                return jsonify({'message': 'Failed to verify user identity'}), 400
+                return jsonify({'message': error}), 400
 
             # --- Check for Admin Access AFTER user_info is available ---
             user_email = user_info.get('email')
@@ -448,20 +1023,16 @@ def create_app(config_name='default'):
                 #     app.logger.info(f"[User] User {user_email} authenticated via Google Auth (not admin).")
             # --- End Admin Check ---
 
-            # Check if user has already voted
-            if voter_session.has_voted(user_info['user_id']):
-                return jsonify({'message': 'You have already voted in this election'}), 400
+            # No has-voted check here: signing in is election-agnostic, and each
+            # election's submit route (and session/bootstrap hasVoted) checks it
 
-            # Create voter session (pass the is_admin flag)
-            session_id = voter_session.create_session(
+            # Create voter session (pass the is_admin flag) and store it in the Flask session
+            start_voter_session(
                 user_info['user_id'],
                 user_info['email'],
                 user_info['name'],
                 is_admin=is_admin # Pass the calculated is_admin flag
             )
-
-            # Store session ID in Flask session
-            session['voter_session_id'] = session_id
             session['user_info'] = user_info
 
             # Redirect to voting page
@@ -476,11 +1047,11 @@ def create_app(config_name='default'):
     # @access  Authenticated
     @app.route('/api/auth/session', methods=['GET'])
     def get_voter_session():
-        session_id = session.get('voter_session_id')
+        session_id = session_credential()
         if not session_id:
             return jsonify({'message': 'Not authenticated'}), 401
 
-        voter_info = voter_session.get_session(session_id)
+        voter_info = current_voter()
         if not voter_info:
             return jsonify({'message': 'Invalid session'}), 401
 
@@ -491,7 +1062,7 @@ def create_app(config_name='default'):
                 'name': voter_info['name'],
                 'email': voter_info['email']
             },
-            'hasVoted': voter_info['has_voted'], # <-- Comma added here
+            'hasVoted': voter_has_voted(voter_info), # <-- Comma added here
             'isAdmin': voter_info.get('is_admin', False) # Include admin status
         }), 200
         # --- End FIX ---
@@ -502,6 +1073,7 @@ def create_app(config_name='default'):
     @app.route('/api/auth/logout', methods=['POST'])
     def logout():
         session.pop('voter_session_id', None)
+        session.pop('voter_token', None)
         session.pop('user_info', None)
         return jsonify({'message': 'Logged out successfully'}), 200
 
@@ -509,19 +1081,19 @@ def create_app(config_name='default'):
     # @route   POST /api/auth/demo
     # @access  Public
     @app.route('/api/auth/demo', methods=['POST'])
+    @rate_limited('auth', write=True)
     def demo_auth():
         try:
             # Create a demo session (not an admin by default in demo mode)
             demo_user_id = f"DEMO_USER_{uuid.uuid4().hex[:8].upper()}"
-            session_id = voter_session.create_session(
+            start_voter_session(
                 demo_user_id,
                 'demo@example.com',
                 'Demo User',
                 is_admin=False # Explicitly set is_admin=False for demo users
             )
 
-            # Store session ID in Flask session
-            session['voter_session_id'] = session_id
+            # Store user info in Flask session
             session['user_info'] = {
                 'user_id': demo_user_id,
                 'email': 'demo@example.com',
@@ -543,42 +1115,47 @@ def create_app(config_name='default'):
     # @desc    Export votes to CSV (Updated Format with Names)
     # @route   GET /api/admin/export-csv
     # @access  Admin (protected by require_admin)
-    @app.route('/api/admin/export-csv', methods=['GET'])
+    @election_route('/admin/export-csv', methods=['GET'])
     @require_admin
-    def export_votes_to_csv():
+    def export_votes_to_csv(election_id):
         try:
             # --- Fetch data ---
-            votes_data = get_votes()
-            candidates = get_candidates()
+            votes_data = get_votes(election_id)
+            candidates = request_candidates(election_id)
 
             # --- Create candidate lookup dict ---
             # Map candidate ID to candidate name for easy lookup
             candidate_lookup = {c.id: c.name for c in candidates}
 
+            # Column counts follow the election's ballot rules (executives are among the selections)
+            election = request_election(election_id)
+            executive_columns = election.max_executives
+            council_columns = max(election.max_selections - election.max_executives, 0)
+
             # --- Generate CSV in memory ---
             output = io.StringIO()
             writer = csv.writer(output)
 
             # --- Write CSV header ---
             header = ['Voter ID']
-            header.extend([f'Executive {i+1}' for i in range(7)])
-            header.extend([f'Council {i+1}' for i in range(8)])
+            header.extend([f'Executive {i+1}' for i in range(executive_columns)])
+            header.extend([f'Council {i+1}' for i in range(council_columns)])
             writer.writerow(header)
 
             # --- Write vote data ---
             for vote in votes_data.votes:
                 row = [vote.voter_id] # Start with Voter ID
 
-                # Add Executive Officers (up to 7) - Lookup names
-                executive_names_list = [candidate_lookup.get(cid, f"Unknown ID: {cid}") for cid in vote.executive_candidates[:7]]
-                executive_names_list.extend([''] * (7 - len(executive_names_list)))
+                # Add Executive Officers (up to max_executives) - Lookup names
+                executive_names_list = [candidate_lookup.get(cid, f"Unknown ID: {cid}") for cid in vote.executive_candidates[:executive_columns]]
+                executive_names_list.extend([''] * (executive_columns - len(executive_names_list)))
                 row.extend(executive_names_list)
 
-                # Add remaining Council Members (up to 8) - Lookup names
+                # Add remaining Council Members (up to the remaining selections) - Lookup names
                 # Filter out candidates already listed as Executive Officers
                 remaining_council_ids = [cid for cid in vote.selected_candidates if cid not in set(vote.executive_candidates)]
-                remaining_council_names_list = [candidate_lookup.get(cid, f"Unknown ID: {cid}") for cid in remaining_council_ids[:8]]
-                remaining_council_names_list.extend([''] * (8 - len(remaining_council_names_list)))
+                remaining_council_names_list = [candidate_lookup.get(cid, f"Unknown ID: {cid}") for cid in remaining_council_ids[:council_columns]]
+                remaining_council_names_list.extend([''] * (council_columns - len(remaining_council_names_list)))
                 row.extend(remaining_council_names_list)
 
                 writer.writerow(row)
@@ -602,9 +1179,44 @@ def create_app(config_name='default'):
             return jsonify({'message': 'An internal server error occurred during CSV export.'}), 500
     # --- END NEW ROUTE ---
 
+    # @desc    Export ballots as a columnar binary file (?format=arrow|npz;
+    #          defaults to Arrow IPC when pyarrow is installed, else .npz)
+    # @route   GET /api/admin/export-columnar
+    # @access  Admin (protected by require_admin)
+    @election_route('/admin/export-columnar', methods=['GET'])
+    @require_admin
+    def export_votes_columnar(election_id):
+        formats = available_formats()
+        export_format = request.args.get('format') or (formats[0] if formats else 'npz')
+        if export_format not in ('arrow', 'npz'):
+            return jsonify({'message': 'format must be arrow or npz'}), 400
+        if export_format not in formats:
+            return jsonify({'message': f"The {export_format} export is not available on this server "
+                                       f"(requires {'pyarrow' if export_format == 'arrow' else 'NumPy'})"}), 503
+
+        election = request_election(election_id)
+        candidates = [(c.id, c.name) for c in request_candidates(election_id)]
+        writer, mimetype, extension = {
+            'arrow': (write_ballots_arrow, 'application/vnd.apache.arrow.file', 'arrow'),
+            'npz': (write_ballots_npz, 'application/octet-stream', 'npz')
+        }[export_format]
+        # Built in a temporary file, then streamed; the file is deleted once closed
+        output = tempfile.TemporaryFile()
+        try:
+            writer(output, iter_vote_chunks(app.config['EXPORT_CHUNK_SIZE'], election_id), candidates,
+                   election_id, election.max_selections, election.max_executives)
+        except Exception as err:
+            output.close()
+            app.logger.error(f"Error writing {export_format} export: {err}")
+            return jsonify({'message': 'An internal server error occurred during the export.'}), 500
+        output.seek(0)
+        return send_file(output, mimetype=mimetype, as_attachment=True,
+                         download_name=f'ballots_{election_id}.{extension}')
+
     # --- THE FINAL LINE OF THE FUNCTION ---
     return app
 
+# Run from the project root with: python -m backend.app
 if __name__ == '__main__':
     app = create_app('development')
     app.run(debug=True, port=5000)
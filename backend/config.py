@@ -4,6 +4,93 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD') or 'admin2024'
     DATA_FOLDER = os.path.join(os.path.dirname(__file__), 'data')
+
+    # Demo voter IDs are kept in a shared SQLite store (data/voter_ids.sqlite3)
+    # so every worker can verify them. IDs expire after VOTER_ID_TTL_SECONDS and
+    # at most VOTER_ID_MAX_ENTRIES are retained.
+    VOTER_ID_TTL_SECONDS = int(os.environ.get('VOTER_ID_TTL_SECONDS') or 7 * 24 * 3600)
+    VOTER_ID_MAX_ENTRIES = int(os.environ.get('VOTER_ID_MAX_ENTRIES') or 100000)
+
+    # A vote submission sent with an Idempotency-Key header has its successful
+    # response kept for IDEMPOTENCY_TTL_SECONDS in data/idempotency.sqlite3
+    # (shared by all workers, at most IDEMPOTENCY_MAX_ENTRIES); a retry with
+    # the same key gets that response back without touching the vote store.
+    IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS') or 24 * 3600)
+    IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get('IDEMPOTENCY_MAX_ENTRIES') or 100000)
+
+    # Stateless sessions: carry the voter's identity in a signed token (derived
+    # from SECRET_KEY) instead of looking it up in voter_sessions.json.
+    STATELESS_SESSIONS = os.environ.get('STATELESS_SESSIONS', '').lower() in ('1', 'true', 'yes')
+    SESSION_TOKEN_MAX_AGE = int(os.environ.get('SESSION_TOKEN_MAX_AGE') or 12 * 3600)
+
+    # Server-side sessions expire SESSION_TTL_SECONDS after login, or after
+    # SESSION_IDLE_SECONDS without activity. A background sweeper removes them
+    # from voter_sessions.json every SESSION_SWEEP_INTERVAL seconds (0 disables).
+    SESSION_TTL_SECONDS = int(os.environ.get('SESSION_TTL_SECONDS') or 24 * 3600)
+    SESSION_IDLE_SECONDS = int(os.environ.get('SESSION_IDLE_SECONDS') or 2 * 3600)
+    SESSION_SWEEP_INTERVAL = int(os.environ.get('SESSION_SWEEP_INTERVAL') or 300)
+
+    # JSON API responses larger than this are gzip/brotli compressed when the
+    # client accepts it; immutable payloads keep their encoded bytes cached,
+    # up to JSON_CACHE_ENTRIES bodies and JSON_CACHE_MAX_BYTES per worker.
+    # Bodies over JSON_CACHE_MAX_BODY_BYTES (full exports) are not cached.
+    JSON_COMPRESS_MIN_BYTES = int(os.environ.get('JSON_COMPRESS_MIN_BYTES') or 1024)
+    JSON_CACHE_ENTRIES = int(os.environ.get('JSON_CACHE_ENTRIES') or 64)
+    JSON_CACHE_MAX_BYTES = int(os.environ.get('JSON_CACHE_MAX_BYTES') or 16 * 1024 * 1024)
+    JSON_CACHE_MAX_BODY_BYTES = int(os.environ.get('JSON_CACHE_MAX_BODY_BYTES') or 1024 * 1024)
+
+    # Candidate photos are downloaded once, resized to square thumbnails and
+    # served from /photos/ (requires Pillow). Disk use is capped at
+    # PHOTO_CACHE_MAX_BYTES with least-recently-used eviction.
+    PHOTO_CACHE_ENABLED = os.environ.get('PHOTO_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    PHOTO_CACHE_FOLDER = os.environ.get('PHOTO_CACHE_FOLDER') or os.path.join(DATA_FOLDER, 'photos')
+    PHOTO_THUMBNAIL_SIZE = int(os.environ.get('PHOTO_THUMBNAIL_SIZE') or 160)
+    PHOTO_CACHE_MAX_BYTES = int(os.environ.get('PHOTO_CACHE_MAX_BYTES') or 50 * 1024 * 1024)
+
+    # Per-client token-bucket limits ('requests/seconds') on the auth and vote
+    # endpoints, and a per-worker cap on concurrent write requests. Excess load
+    # gets 429/503 with Retry-After. RATE_LIMIT_BACKEND='sqlite' shares the
+    # buckets between workers via data/rate_limits.sqlite3.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND') or 'memory'
+    RATE_LIMITS = {
+        'auth': os.environ.get('RATE_LIMIT_AUTH') or '10/60',
+        'request_id': os.environ.get('RATE_LIMIT_REQUEST_ID') or '5/60',
+        'submit': os.environ.get('RATE_LIMIT_SUBMIT') or '5/60'
+    }
+    WRITE_CONCURRENCY_LIMIT = int(os.environ.get('WRITE_CONCURRENCY_LIMIT') or 4)
+    # Number of reverse proxies in front of the app that append to
+    # X-Forwarded-For. Clients are identified by the address the nearest
+    # trusted proxy saw; anything further left in the header is client-supplied
+    # and ignored. PythonAnywhere has one front-end proxy; use 0 when serving
+    # the app directly.
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR') or 1)
+
+    # Every election is stored in its own partition. The default election
+    # (served by the un-prefixed /api/... routes) uses data/ itself; others
+    # live in data/elections/<id>/ and are served under /api/elections/<id>/.
+    # Ballot rules default to these values unless an election's election.json
+    # sets max_selections / max_executives.
+    DEFAULT_ELECTION_ID = os.environ.get('DEFAULT_ELECTION_ID') or 'council'
+    DEFAULT_ELECTION_TITLE = os.environ.get('DEFAULT_ELECTION_TITLE') or 'Phoenix Council Elections'
+    MAX_SELECTIONS = int(os.environ.get('MAX_SELECTIONS') or 15)
+    MAX_EXECUTIVES = int(os.environ.get('MAX_EXECUTIVES') or 7)
+
+    # Ballots are partitioned by voter ID across VOTE_LOG_SHARDS logs in
+    # data/, each with its own lock, so submits on different shards commit in
+    # parallel. This only sets the layout of a new store; an existing store
+    # keeps the count recorded in votes.shards until `python -m backend.reshard`
+    # is run with the server stopped.
+    VOTE_LOG_SHARDS = int(os.environ.get('VOTE_LOG_SHARDS') or 1)
+
+    # /api/admin/export pages through the vote log when given ?cursor= or
+    # ?limit=; limit defaults to EXPORT_PAGE_SIZE and is capped at EXPORT_PAGE_MAX.
+    EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE') or 1000)
+    EXPORT_PAGE_MAX = int(os.environ.get('EXPORT_PAGE_MAX') or 10000)
+
+    # /api/admin/export-columnar reads the vote log EXPORT_CHUNK_SIZE ballots
+    # at a time while building the .npz / Arrow file.
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE') or 50000)
     
     # Google OAuth2 Configuration
     # To set up Google OAuth2:
@@ -17,6 +104,21 @@ class Config:
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID') or '1074941079810-cpt1elnhmip3k0881cl5q0vt4gan3qtv.apps.googleusercontent.com'
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET') or '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'
     GOOGLE_REDIRECT_URI = os.environ.get('GOOGLE_REDIRECT_URI') or 'https://hussam.pythonanywhere.com/auth/google/callback'
+    # Endpoint overrides, e.g. to load-test logins against a local mock provider
+    GOOGLE_AUTH_URI = os.environ.get('GOOGLE_AUTH_URI') or 'https://accounts.google.com/o/oauth2/auth'
+    GOOGLE_TOKEN_URI = os.environ.get('GOOGLE_TOKEN_URI') or 'https://oauth2.googleapis.com/token'
+    GOOGLE_CERTS_URL = os.environ.get('GOOGLE_CERTS_URL') or 'https://www.googleapis.com/oauth2/v1/certs'
+    GOOGLE_USERINFO_URL = os.environ.get('GOOGLE_USERINFO_URL') or 'https://www.googleapis.com/oauth2/v2/userinfo'
+
+    # The OAuth round-trips of a login (token exchange, certificate fetch) run
+    # on a dedicated pool of OAUTH_POOL_WORKERS threads per worker process,
+    # with at most OAUTH_MAX_PENDING more logins waiting for one. Logins beyond
+    # that get 503 with Retry-After and logins slower than OAUTH_TIMEOUT_SECONDS
+    # get 504, so a slow provider cannot park every request thread. Set
+    # OAUTH_POOL_WORKERS=0 to make the calls on the request thread instead.
+    OAUTH_POOL_WORKERS = int(os.environ.get('OAUTH_POOL_WORKERS') or 2)
+    OAUTH_MAX_PENDING = int(os.environ.get('OAUTH_MAX_PENDING') or 2)
+    OAUTH_TIMEOUT_SECONDS = float(os.environ.get('OAUTH_TIMEOUT_SECONDS') or 10)
     
     @staticmethod
     def init_app(app):
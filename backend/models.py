@@ -36,6 +36,16 @@ class VotesData:
             "votes": [vote.to_dict() for vote in self.votes]
         }
 
+@dataclass
+class Election:
+    id: str
+    title: str
+    max_selections: int
+    max_executives: int
+
+    def to_dict(self):
+        return asdict(self)
+
 @dataclass
 class ElectionStatus:
     is_open: bool
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Independent recount of the Phoenix Council election.
+
+Reads the vote store in chunks, tallies the chunks in parallel across a
+multiprocessing pool using the same counting rules as /api/results, merges
+the partial counts and (optionally) compares them with what a running server
+reports.
+
+Usage (from the project root):
+    python -m backend.recount [--election ID] [--votes-file PATH] [--workers N] [--chunk-size N]
+                              [--server https://majiddaas2.pythonanywhere.com]
+
+Exits with status 1 if the recount disagrees with the server.
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.request
+
+from .utils.data_handler import (
+    get_candidates, iter_ballot_chunks, ballot_chunk_ranges, load_ballot_chunk, DEFAULT_ELECTION_ID, election_exists
+)
+from .utils.tally import tally_ballots, merge_tallies, rank_results
+
+
+def _tally_chunk(chunk):
+    return tally_ballots(chunk)
+
+
+def _tally_range(bounds, election_id=DEFAULT_ELECTION_ID):
+    # Each worker parses its own slice of the vote log
+    return tally_ballots(load_ballot_chunk(bounds, election_id))
+
+
+def recount(votes_file=None, workers=None, chunk_size=50000, election_id=DEFAULT_ELECTION_ID):
+    """
+    Tally every ballot in parallel.
+    Returns (council counts, executive counts, total ballots, elapsed seconds).
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if votes_file is None:
+        # The vote log is indexed, so workers get position ranges rather than parsed ballots
+        tasks = ballot_chunk_ranges(chunk_size, election_id)
+        tally = functools.partial(_tally_range, election_id=election_id)
+    else:
+        tasks, tally = iter_ballot_chunks(chunk_size=chunk_size, votes_file=votes_file), _tally_chunk
+    if workers == 1:
+        council, executive, total = merge_tallies(tally(task) for task in tasks)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            council, executive, total = merge_tallies(pool.imap_unordered(tally, tasks))
+    return council, executive, total, time.perf_counter() - start
+
+
+def fetch_server_results(server_url, election_id=DEFAULT_ELECTION_ID):
+    """GET an election's results from a running server."""
+    path = '/api/results' if election_id == DEFAULT_ELECTION_ID else f'/api/elections/{election_id}/results'
+    with urllib.request.urlopen(server_url.rstrip('/') + path, timeout=30) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def diff_against_server(results, total, server):
+    """Compare recounted results with the server's. Returns a list of discrepancy messages."""
+    problems = []
+    server_total = server.get('stats', {}).get('totalVotes')
+    if server_total != total:
+        problems.append(f"total ballots: recount {total}, server {server_total}")
+    if server.get('isOpen'):
+        # Per-candidate counts are only published once the election is closed
+        return problems
+    server_by_id = {r['id']: r for r in server.get('results', [])}
+    for result in results:
+        reported = server_by_id.pop(result['id'], None)
+        if reported is None:
+            problems.append(f"candidate {result['id']} ({result['name']}): missing from server results")
+            continue
+        for field in ('councilVotes', 'executiveVotes'):
+            if reported.get(field) != result[field]:
+                problems.append(f"candidate {result['id']} ({result['name']}) {field}: "
+                                f"recount {result[field]}, server {reported.get(field)}")
+    for candidate_id in server_by_id:
+        problems.append(f"candidate {candidate_id}: reported by server but not in candidates.json")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--election', default=DEFAULT_ELECTION_ID, help='election id (default: the default election)')
+    parser.add_argument('--votes-file', help='export to recount (default: the vote log in data/)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='ballots per chunk')
+    parser.add_argument('--server', help='base URL of a running server to cross-check against')
+    parser.add_argument('--top', type=int, default=15, help='number of ranked candidates to print')
+    args = parser.parse_args()
+
+    if not election_exists(args.election):
+        parser.error(f"unknown election: {args.election}")
+    candidates = [c.to_dict() for c in get_candidates(args.election)]
+    council, executive, total, elapsed = recount(args.votes_file, args.workers, args.chunk_size, args.election)
+    results = rank_results(candidates, council, executive)
+
+    print(f"Recounted {total:,} ballots in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} ballots/s, {args.workers or os.cpu_count()} workers)")
+    print(f"{'#':>3}  {'Candidate':<28} {'Council':>10} {'Executive':>10}")
+    for rank, result in enumerate(results[:args.top], start=1):
+        print(f"{rank:>3}  {result['name']:<28} {result['councilVotes']:>10,} {result['executiveVotes']:>10,}")
+
+    if not args.server:
+        return 0
+    problems = diff_against_server(results, total, fetch_server_results(args.server, args.election))
+    if problems:
+        print(f"\nMISMATCH: {len(problems)} discrepancies with {args.server}")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print(f"\nRecount matches the counts reported by {args.server}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Change the number of shards of an election's vote store.
+
+The server always opens a store with the shard count recorded in its
+votes.shards file, whatever VOTE_LOG_SHARDS says; this command redistributes
+the ballots over a new count and records it. Stop the server first: it
+refuses to run while any process (a server worker, a recount) has the store
+open.
+
+Usage (from the project root):
+    python -m backend.reshard [--shards N] [--election ID]
+
+--shards defaults to VOTE_LOG_SHARDS. Exits with status 1 if the store is in use.
+"""
+
+import argparse
+import sys
+import time
+
+from .config import Config
+from .utils.data_handler import DEFAULT_ELECTION_ID, election_exists, get_election_folder
+from .utils.vote_log import StoreInUse, reshard
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--election', default=DEFAULT_ELECTION_ID, help='election id (default: the default election)')
+    parser.add_argument('--shards', type=int, default=Config.VOTE_LOG_SHARDS,
+                        help='new shard count (default: VOTE_LOG_SHARDS)')
+    args = parser.parse_args()
+
+    if not election_exists(args.election):
+        parser.error(f"unknown election: {args.election}")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    start = time.perf_counter()
+    try:
+        previous, total = reshard(get_election_folder(args.election), args.shards)
+    except StoreInUse as e:
+        print(f"Refusing to reshard: {e}")
+        return 1
+    if previous == args.shards:
+        print(f"Vote store for {args.election} already has {args.shards} shard(s) ({total:,} ballots); nothing to do")
+    else:
+        print(f"Resharded {total:,} ballots for {args.election} from {previous} to {args.shards} shard(s) "
+              f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+# backend/utils/__init__.py - Helper modules (authentication, data storage)
@@ -0,0 +1,99 @@
+# backend/utils/assets.py
+import hashlib
+import os
+from typing import Dict, Optional
+
+from .compression import SUPPORTED_ENCODINGS, ENCODING_SUFFIXES, compress
+
+# Assets referenced from index.html, relative to the frontend folder
+DEFAULT_ASSETS = ('css/styles.css', 'js/api.js', 'js/main.js')
+
+
+class AssetPipeline:
+    """
+    Fingerprinted, precompressed copies of the frontend assets.
+
+    build() copies each asset to build_dir under a content-hashed name
+    (css/styles.<hash>.css), rewrites the references in index.html, and writes
+    .gz (and .br, if brotli is installed) files next to every output. Because a
+    fingerprinted URL never changes content, it can be cached as immutable, and
+    workers serve compressed bytes from disk instead of compressing per request.
+    """
+
+    def __init__(self, source_dir: str, build_dir: str, assets=DEFAULT_ASSETS):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.assets = assets
+        # logical path ('js/main.js') -> fingerprinted path ('js/main.1a2b3c4d5e6f.js')
+        self.manifest: Dict[str, str] = {}
+        # fingerprinted paths that may be served as immutable
+        self.fingerprinted = set()
+
+    @staticmethod
+    def _fingerprint(path: str, content: bytes) -> str:
+        """Insert a content hash before the file extension."""
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        base, ext = os.path.splitext(path)
+        return f"{base}.{digest}{ext}"
+
+    def _write(self, relative_path: str, content: bytes):
+        """Write an output file plus its precompressed variants (atomic, skipped if already built)."""
+        target = os.path.join(self.build_dir, relative_path)
+        variants = [(target + ENCODING_SUFFIXES[e], e) for e in SUPPORTED_ENCODINGS]
+        if all(os.path.exists(path) for path, _ in variants) and os.path.exists(target):
+            with open(target, 'rb') as f:
+                if f.read() == content:
+                    return  # Built by another worker or a previous start
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # The plain file goes last, so a matching plain file implies its variants are current
+        for path, encoding in variants + [(target, None)]:
+            data = content if encoding is None else compress(content, encoding)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def build(self) -> Dict[str, str]:
+        """Fingerprint and precompress all assets and index.html. Returns the manifest."""
+        manifest = {}
+        for asset in self.assets:
+            with open(os.path.join(self.source_dir, asset), 'rb') as f:
+                content = f.read()
+            hashed = self._fingerprint(asset, content)
+            self._write(hashed, content)
+            manifest[asset] = hashed
+
+        with open(os.path.join(self.source_dir, 'index.html'), 'r', encoding='utf-8') as f:
+            index_html = f.read()
+        for asset, hashed in manifest.items():
+            index_html = index_html.replace(f'"{asset}"', f'"{hashed}"')
+        self._write('index.html', index_html.encode('utf-8'))
+
+        self.manifest = manifest
+        self.fingerprinted = set(manifest.values())
+        return manifest
+
+    def resolve(self, relative_path: str, encoding: Optional[str]):
+        """
+        Return (file_path, encoding) for a built file, choosing the precompressed
+        copy when the client accepts it. Returns None if the file was not built.
+        """
+        path = os.path.join(self.build_dir, relative_path)
+        if relative_path != 'index.html' and relative_path not in self.fingerprinted:
+            return None
+        if encoding is not None:
+            compressed = path + ENCODING_SUFFIXES[encoding]
+            if os.path.exists(compressed):
+                return compressed, encoding
+        if os.path.exists(path):
+            return path, None
+        return None
+
+
+if __name__ == '__main__':
+    # Prebuild at deploy time: python -m backend.utils.assets
+    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'frontend')
+    pipeline = AssetPipeline(frontend_dir, os.path.join(frontend_dir, 'dist'))
+    for source, built in pipeline.build().items():
+        print(f"{source} -> {built}")
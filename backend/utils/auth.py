@@ -1,17 +1,49 @@
 import os
 import json
 from typing import Optional, Dict, Any
-from google_auth_oauthlib.flow import Flow
-from google.oauth2 import id_token
-from google.auth.transport import requests
-import requests as http_requests
 import datetime
+import threading
+import time
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+# The Google OAuth stack (google-auth, oauthlib, requests) is imported lazily
+# inside GoogleAuth so that workers which never serve a login don't pay for it
+# at start-up.
+
+GOOGLE_AUTH_URI = 'https://accounts.google.com/o/oauth2/auth'
+GOOGLE_TOKEN_URI = 'https://oauth2.googleapis.com/token'
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+GOOGLE_USERINFO_URL = 'https://www.googleapis.com/oauth2/v2/userinfo'
 
 class GoogleAuth:
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
+    """
+    Google Sign-In. Every network call carries a `timeout`, and Google's
+    signing certificates are cached for as long as their Cache-Control allows,
+    so verifying an ID token normally needs no request at all. When an IOPool
+    is given, authenticate() runs the login round-trips on it instead of on
+    the request thread (see backend/utils/io_pool.py). The endpoint URLs can
+    be pointed at a mock provider for load tests.
+    """
+
+    # Used when the certificate response has no usable max-age
+    DEFAULT_CERTS_MAX_AGE = 300
+
+    def __init__(self, client_id: str, client_secret: str, redirect_uri: str,
+                 timeout: float = 10.0, pool=None,
+                 auth_uri: str = GOOGLE_AUTH_URI, token_uri: str = GOOGLE_TOKEN_URI,
+                 certs_url: str = GOOGLE_CERTS_URL, userinfo_url: str = GOOGLE_USERINFO_URL):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
+        self.timeout = timeout
+        self.pool = pool
+        self.auth_uri = auth_uri
+        self.token_uri = token_uri
+        self.certs_url = certs_url
+        self.userinfo_url = userinfo_url
+        self._certs = None
+        self._certs_expire_at = 0.0
+        self._certs_lock = threading.Lock()
         
         # OAuth2 scopes for Google Sign-In
         self.scopes = [
@@ -20,22 +52,26 @@ class GoogleAuth:
             'https://www.googleapis.com/auth/userinfo.profile'
         ]
     
-    def get_authorization_url(self) -> str:
-        """Generate Google OAuth2 authorization URL."""
+    def _flow(self):
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             {
                 "web": {
                     "client_id": self.client_id,
                     "client_secret": self.client_secret,
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
+                    "auth_uri": self.auth_uri,
+                    "token_uri": self.token_uri,
                     "redirect_uris": [self.redirect_uri]
                 }
             },
             scopes=self.scopes
         )
         flow.redirect_uri = self.redirect_uri
-        
+        return flow
+    
+    def get_authorization_url(self) -> str:
+        """Generate Google OAuth2 authorization URL."""
+        flow = self._flow()
         authorization_url, state = flow.authorization_url(
             access_type='offline',
             include_granted_scopes='true'
@@ -45,22 +81,9 @@ class GoogleAuth:
     
     def exchange_code_for_tokens(self, authorization_code: str) -> Optional[Dict[str, Any]]:
         """Exchange authorization code for access and ID tokens."""
-        flow = Flow.from_client_config(
-            {
-                "web": {
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "redirect_uris": [self.redirect_uri]
-                }
-            },
-            scopes=self.scopes
-        )
-        flow.redirect_uri = self.redirect_uri
-        
+        flow = self._flow()
         try:
-            flow.fetch_token(code=authorization_code)
+            flow.fetch_token(code=authorization_code, timeout=self.timeout)
             return {
                 'access_token': flow.credentials.token,
                 'id_token': flow.credentials.id_token,
@@ -70,14 +93,34 @@ class GoogleAuth:
             print(f"Error exchanging code for tokens: {e}")
             return None
     
+    def _signing_certs(self, refresh: bool = False) -> Dict[str, str]:
+        """Google's current token signing certificates ({key id: PEM}), cached."""
+        import requests as http_requests
+        with self._certs_lock:
+            if not refresh and self._certs is not None and time.time() < self._certs_expire_at:
+                return self._certs
+        response = http_requests.get(self.certs_url, timeout=self.timeout)
+        response.raise_for_status()
+        certs = response.json()
+        max_age = self.DEFAULT_CERTS_MAX_AGE
+        for directive in response.headers.get('Cache-Control', '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name.lower() == 'max-age' and value.isdigit():
+                max_age = int(value)
+        with self._certs_lock:
+            self._certs = certs
+            self._certs_expire_at = time.time() + max_age
+        return certs
+    
     def verify_id_token(self, id_token_str: str) -> Optional[Dict[str, Any]]:
         """Verify Google ID token and extract user information."""
+        from google.auth import jwt
         try:
-            idinfo = id_token.verify_oauth2_token(
-                id_token_str, 
-                requests.Request(), 
-                self.client_id
-            )
+            certs = self._signing_certs()
+            if jwt.decode_header(id_token_str).get('kid') not in certs:
+                # Signed with a key rotated in since the certificates were cached
+                certs = self._signing_certs(refresh=True)
+            idinfo = jwt.decode(id_token_str, certs=certs, audience=self.client_id)
             
             # Verify the token was issued by Google
             if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
@@ -100,21 +143,59 @@ class GoogleAuth:
     
     def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user information from Google API using access token."""
+        import requests as http_requests
         try:
             response = http_requests.get(
-                'https://www.googleapis.com/oauth2/v2/userinfo',
-                headers={'Authorization': f'Bearer {access_token}'}
+                self.userinfo_url,
+                headers={'Authorization': f'Bearer {access_token}'},
+                timeout=self.timeout
             )
             response.raise_for_status()
             return response.json()
         except Exception as e:
             print(f"Error getting user info: {e}")
             return None
+    
+    def _authenticate(self, authorization_code: str):
+        tokens = self.exchange_code_for_tokens(authorization_code)
+        if not tokens:
+            return None, 'Failed to exchange authorization code'
+        user_info = self.verify_id_token(tokens['id_token'])
+        if not user_info:
+            return None, 'Failed to verify user identity'
+        return user_info, None
+    
+    def authenticate(self, authorization_code: str):
+        """
+        Exchange an authorization code and verify the resulting ID token.
+        Returns (user_info, None) or (None, error message). With a pool, raises
+        IOPoolBusy when it is full and IOPoolTimeout when Google is too slow.
+        """
+        if self.pool is None:
+            return self._authenticate(authorization_code)
+        return self.pool.run(self._authenticate, authorization_code)
 
 # Voter session management
 class VoterSession:
-    def __init__(self):
+    """
+    Server-side voter sessions persisted in data/voter_sessions.json.
+
+    Sessions expire ttl seconds after creation, or idle_ttl seconds after they
+    were last used (abandoned logins). Expired sessions are rejected on lookup
+    and physically removed by sweep(), which also compacts the file; call
+    start_sweeper() to run it periodically in a background thread.
+    """
+    def __init__(self, ttl: Optional[float] = None, idle_ttl: Optional[float] = None):
         self.sessions_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'voter_sessions.json')
+        self.ttl = ttl
+        self.idle_ttl = idle_ttl
+        self._lock = threading.RLock()
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
+        # Metrics
+        self.evicted_total = 0
+        self.reclaimed_bytes = 0
+        self.last_sweep_at = None
         self._load_sessions()
     
     def _load_sessions(self):
@@ -124,43 +205,170 @@ class VoterSession:
                 self.sessions = json.load(f)
         except FileNotFoundError:
             self.sessions = {}
+        # Index of users who voted, so has_voted() doesn't scan every session
+        self._voted_users = {s['user_id'] for s in self.sessions.values() if s.get('has_voted')}
     
     def _save_sessions(self):
-        """Save voter sessions to file."""
+        """Save voter sessions to file (atomically, so readers never see a partial file)."""
         os.makedirs(os.path.dirname(self.sessions_file), exist_ok=True)
-        with open(self.sessions_file, 'w') as f:
-            json.dump(self.sessions, f, indent=2)
+        with self._lock:
+            tmp_file = self.sessions_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(self.sessions, f, indent=2)
+            os.replace(tmp_file, self.sessions_file)
     
     def create_session(self, user_id: str, email: str, name: str, is_admin: bool = False) -> str:
         """Create a new voter session."""
         import uuid
         session_id = str(uuid.uuid4())
+        now = time.time()
         
-        self.sessions[session_id] = {
-            'user_id': user_id,
-            'email': email,
-            'name': name,
-            'created_at': str(datetime.datetime.now()),
-            'has_voted': False,
-            'is_admin': is_admin
-        }
-        
-        self._save_sessions()
+        with self._lock:
+            self.sessions[session_id] = {
+                'user_id': user_id,
+                'email': email,
+                'name': name,
+                'created_at': str(datetime.datetime.now()),
+                'has_voted': False,
+                'is_admin': is_admin,
+                'expires_at': now + self.ttl if self.ttl else None,
+                'last_seen': now
+            }
+            self._save_sessions()
         return session_id
     
+    def _is_expired(self, session: Dict[str, Any], now: float) -> bool:
+        """Check a session against the absolute and idle TTLs."""
+        expires_at = session.get('expires_at')
+        if expires_at is None and self.ttl and session.get('created_at'):
+            # Sessions written before TTLs existed: derive expiry from created_at
+            try:
+                created = datetime.datetime.fromisoformat(session['created_at']).timestamp()
+                expires_at = created + self.ttl
+            except ValueError:
+                expires_at = None
+        if expires_at is not None and now >= expires_at:
+            return True
+        last_seen = session.get('last_seen')
+        if self.idle_ttl and last_seen is not None and now - last_seen >= self.idle_ttl:
+            return True
+        return False
+    
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get voter session by session ID."""
-        return self.sessions.get(session_id)
+        """Get voter session by session ID (None if unknown or expired)."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.time()
+        if self._is_expired(session, now):
+            return None
+        # Activity is only tracked in memory; it is persisted on the next write or sweep
+        session['last_seen'] = now
+        return session
     
     def mark_voted(self, session_id: str):
         """Mark a voter as having voted."""
-        if session_id in self.sessions:
-            self.sessions[session_id]['has_voted'] = True
-            self._save_sessions()
+        with self._lock:
+            if session_id in self.sessions:
+                self.sessions[session_id]['has_voted'] = True
+                self._voted_users.add(self.sessions[session_id]['user_id'])
+                self._save_sessions()
     
     def has_voted(self, user_id: str) -> bool:
         """Check if a user has already voted."""
-        for session in self.sessions.values():
-            if session['user_id'] == user_id and session['has_voted']:
-                return True
-        return False
+        return user_id in self._voted_users
+
+    def sweep(self) -> int:
+        """
+        Evict expired and abandoned sessions and compact the persisted store.
+        Returns the number of sessions removed.
+        """
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, s in self.sessions.items() if self._is_expired(s, now)]
+            for sid in expired:
+                session = self.sessions.pop(sid)
+                self.reclaimed_bytes += len(json.dumps(session, indent=2))
+            self.evicted_total += len(expired)
+            self.last_sweep_at = now
+            if expired:
+                self._save_sessions()
+        return len(expired)
+
+    def start_sweeper(self, interval: float):
+        """Run sweep() every interval seconds in a daemon thread (idempotent)."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+
+        def run():
+            while not self._stop_sweeper.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Error sweeping voter sessions: {e}")
+
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(target=run, name='voter-session-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the background sweeper thread."""
+        self._stop_sweeper.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Session metrics for the admin metrics endpoint."""
+        try:
+            store_bytes = os.path.getsize(self.sessions_file)
+        except OSError:
+            store_bytes = 0
+        return {
+            'liveSessions': len(self.sessions),
+            'evictedTotal': self.evicted_total,
+            'reclaimedBytes': self.reclaimed_bytes,
+            'storeBytes': store_bytes,
+            'lastSweepAt': self.last_sweep_at
+        }
+
+# Stateless voter sessions
+class SessionTokens:
+    """
+    Signed, expiring session tokens carrying the voter's identity.
+
+    Used instead of VoterSession when STATELESS_SESSIONS is enabled: identity,
+    admin flag and issue time travel in the token itself (signed with
+    SECRET_KEY), so verifying a request needs no storage lookup and works on
+    any worker process.
+    """
+    SALT = 'phoenix-voter-session'
+
+    def __init__(self, secret_key: str, max_age: int):
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(secret_key, salt=self.SALT)
+
+    def issue(self, user_id: str, email: str, name: str, is_admin: bool = False) -> str:
+        """Create a signed token for a voter."""
+        return self._serializer.dumps({
+            'uid': user_id,
+            'email': email,
+            'name': name,
+            'adm': bool(is_admin),
+            'iat': int(time.time())
+        })
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Check the signature and age of a token and return the voter info it carries."""
+        if not token:
+            return None
+        try:
+            payload = self._serializer.loads(token, max_age=self.max_age)
+        except SignatureExpired:
+            return None
+        except BadSignature:
+            return None
+        return {
+            'user_id': payload['uid'],
+            'email': payload['email'],
+            'name': payload['name'],
+            'is_admin': payload.get('adm', False),
+            'issued_at': payload.get('iat')
+        }
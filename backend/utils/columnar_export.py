@@ -0,0 +1,214 @@
+# backend/utils/columnar_export.py
+import itertools
+import json
+import shutil
+import tempfile
+import zipfile
+from typing import Any, BinaryIO, Dict, Iterable, List, Tuple
+
+from .coselection import numpy_available
+
+# NumPy is required for the .npz export; the Arrow IPC export is offered only
+# when pyarrow is installed. Both are imported inside the functions below.
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_formats() -> List[str]:
+    """Export formats this server can write, preferred first."""
+    formats = []
+    if arrow_available() and numpy_available():
+        formats.append('arrow')
+    if numpy_available():
+        formats.append('npz')
+    return formats
+
+
+def _pick_matrix(picks: List[List[int]], width: int):
+    """
+    Fixed-width matrix of candidate ids, one row per ballot, padded with -1.
+    int16 when every id fits (it always does for realistic candidate lists), else int32.
+    """
+    import numpy as np
+    lengths = np.fromiter((len(ids) for ids in picks), dtype=np.int64, count=len(picks))
+    width = max(width, int(lengths.max(initial=0)))
+    matrix = np.full((len(picks), width), -1, dtype=np.int32)
+    ids = np.fromiter(itertools.chain.from_iterable(picks), dtype=np.int32, count=int(lengths.sum()))
+    rows = np.repeat(np.arange(len(picks)), lengths)
+    # Position of each id within its ballot
+    cols = np.arange(len(ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix[rows, cols] = ids
+    if len(ids) == 0 or (ids.min() >= np.iinfo(np.int16).min and ids.max() <= np.iinfo(np.int16).max):
+        matrix = matrix.astype(np.int16)
+    return matrix
+
+
+def _timestamps(values: List[str]):
+    """ISO 8601 timestamps as datetime64[us] (UTC); unparseable ones become NaT."""
+    import numpy as np
+    stripped = [value.rstrip('Z') if isinstance(value, str) else 'NaT' for value in values]
+    try:
+        return np.array(stripped, dtype='datetime64[us]')
+    except ValueError:
+        parsed = np.empty(len(stripped), dtype='datetime64[us]')
+        for i, value in enumerate(stripped):
+            try:
+                parsed[i] = np.datetime64(value, 'us')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
+
+def ballot_columns(votes: List[Dict[str, Any]], max_selections: int, max_executives: int) -> Dict[str, Any]:
+    """
+    One chunk of ballots as columns: voter_id (fixed-width UTF-8 bytes),
+    timestamp (datetime64[us]), and the selected / executive id matrices
+    (int16 or int32, at least max_selections / max_executives wide, padded with -1).
+    """
+    import numpy as np
+    return {
+        'voter_id': np.array([str(vote.get('voter_id', '')).encode('utf-8') for vote in votes], dtype=np.bytes_),
+        'timestamp': _timestamps([vote.get('timestamp') for vote in votes]),
+        'selected': _pick_matrix([vote.get('selected_candidates', []) for vote in votes], max_selections),
+        'executive': _pick_matrix([vote.get('executive_candidates', []) for vote in votes], max_executives)
+    }
+
+
+class _ColumnSpool:
+    """
+    One .npy member built chunk by chunk in a temporary file. Chunks may differ
+    in string width or row length; they are widened (strings) and padded with
+    `fill` (matrices) to the largest seen when the member is written out.
+    """
+
+    def __init__(self, fill=0):
+        self.fill = fill
+        self.file = tempfile.TemporaryFile()
+        self.chunks: List[Tuple[int, Any, Tuple[int, ...]]] = []
+
+    def append(self, array):
+        import numpy as np
+        array = np.ascontiguousarray(array)
+        self.file.write(array.tobytes())
+        self.chunks.append((len(array), array.dtype, array.shape[1:]))
+
+    def _final(self, default_dtype, default_shape):
+        import numpy as np
+        if not self.chunks:
+            return np.dtype(default_dtype), default_shape
+        dtype = max((dtype for _, dtype, _ in self.chunks), key=lambda d: d.itemsize)
+        shape = tuple(max(dims) for dims in zip(*(shape for _, _, shape in self.chunks)))
+        return dtype, shape
+
+    def write_member(self, archive: zipfile.ZipFile, name: str, default_dtype, default_shape=()):
+        import numpy as np
+        dtype, row_shape = self._final(default_dtype, default_shape)
+        rows = sum(count for count, _, _ in self.chunks)
+        with archive.open(f'{name}.npy', 'w', force_zip64=True) as out:
+            np.lib.format.write_array_header_2_0(out, {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': False,
+                'shape': (rows,) + row_shape
+            })
+            self.file.seek(0)
+            if all(chunk_dtype == dtype and shape == row_shape for _, chunk_dtype, shape in self.chunks):
+                shutil.copyfileobj(self.file, out)
+                return
+            for count, chunk_dtype, shape in self.chunks:
+                size = count * chunk_dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+                chunk = np.frombuffer(self.file.read(size), dtype=chunk_dtype).reshape((count,) + shape)
+                if shape != row_shape:
+                    padded = np.full((count,) + row_shape, self.fill, dtype=dtype)
+                    padded[(slice(None),) + tuple(slice(0, n) for n in shape)] = chunk
+                    chunk = padded
+                out.write(np.ascontiguousarray(chunk, dtype=dtype).tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+def write_ballots_npz(out: BinaryIO, chunks: Iterable[List[Dict[str, Any]]], candidates: List[Tuple[int, str]],
+                      election_id: str, max_selections: int, max_executives: int) -> int:
+    """
+    Write ballots to `out` as an uncompressed .npz archive, one chunk of vote
+    dicts at a time (each column is spooled to a temporary file, so memory
+    use is bounded by the chunk size). Arrays:
+      voter_id      (n,) bytes     timestamp  (n,) datetime64[us]
+      selected      (n, s) int16   executive  (n, e) int16
+      candidate_id  (c,) int32     candidate_name (c,) str
+      election      () str
+    Empty selection slots are -1; the matrices are int32 if an id needs it.
+    Load with numpy.load(path), no pickling needed. Members are stored
+    uncompressed, so each array is one contiguous run of bytes in the file.
+    Returns the ballot count.
+    """
+    import numpy as np
+    spools = {'voter_id': _ColumnSpool(), 'timestamp': _ColumnSpool(),
+              'selected': _ColumnSpool(fill=-1), 'executive': _ColumnSpool(fill=-1)}
+    try:
+        for votes in chunks:
+            if votes:
+                for name, column in ballot_columns(votes, max_selections, max_executives).items():
+                    spools[name].append(column)
+        with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            spools['voter_id'].write_member(archive, 'voter_id', 'S1')
+            spools['timestamp'].write_member(archive, 'timestamp', 'datetime64[us]')
+            spools['selected'].write_member(archive, 'selected', np.int16, (max_selections,))
+            spools['executive'].write_member(archive, 'executive', np.int16, (max_executives,))
+            for name, array in (
+                ('candidate_id', np.array([cid for cid, _ in candidates], dtype=np.int32)),
+                ('candidate_name', np.array([name for _, name in candidates], dtype=np.str_)),
+                ('election', np.array(election_id))
+            ):
+                with archive.open(f'{name}.npy', 'w') as member:
+                    np.lib.format.write_array(member, array, allow_pickle=False)
+        return sum(count for count, _, _ in spools['voter_id'].chunks)
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+
+def write_ballots_arrow(out: BinaryIO, chunks: Iterable[List[Dict[str, Any]]], candidates: List[Tuple[int, str]],
+                        election_id: str, max_selections: int, max_executives: int) -> int:
+    """
+    Write ballots to `out` as an Arrow IPC file, one record batch per chunk.
+    Columns: voter_id (string), timestamp (timestamp[us, UTC]), selected and
+    executive (fixed_size_list<int32> of the election's widths, -1 = empty
+    slot). The candidate table and election id are in the schema metadata
+    (JSON). Open with pyarrow.ipc.open_file(pyarrow.memory_map(path)) to read
+    it without copying. Returns the ballot count.
+    """
+    import pyarrow as pa
+    schema = pa.schema([
+        ('voter_id', pa.string()),
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('selected', pa.list_(pa.int32(), max_selections)),
+        ('executive', pa.list_(pa.int32(), max_executives))
+    ], metadata={
+        'election': election_id,
+        'candidates': json.dumps([{'id': cid, 'name': name} for cid, name in candidates])
+    })
+    total = 0
+    with pa.ipc.new_file(out, schema) as writer:
+        for votes in chunks:
+            if not votes:
+                continue
+            columns = ballot_columns(votes, max_selections, max_executives)
+            for name, width in (('selected', max_selections), ('executive', max_executives)):
+                if columns[name].shape[1] != width:
+                    raise ValueError(f"A ballot has more {name} candidates than the election allows "
+                                     f"({columns[name].shape[1]} > {width}); use the npz format")
+            writer.write_batch(pa.record_batch([
+                pa.array([str(vote.get('voter_id', '')) for vote in votes], pa.string()),
+                pa.array(columns['timestamp']).cast(pa.timestamp('us', tz='UTC')),
+                pa.FixedSizeListArray.from_arrays(pa.array(columns['selected'].ravel().astype('int32')), max_selections),
+                pa.FixedSizeListArray.from_arrays(pa.array(columns['executive'].ravel().astype('int32')), max_executives)
+            ], schema=schema))
+            total += len(votes)
+    return total
@@ -0,0 +1,37 @@
+# backend/utils/compression.py
+import gzip
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# Preferred first
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# File suffix used for precompressed copies of an asset
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress(data: bytes, encoding: str, fast: bool = False) -> bytes:
+    """
+    Compress data with the given content-coding ('br' or 'gzip').
+    fast=True trades ratio for speed, for bodies compressed per request.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=4 if fast else 11)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output deterministic for identical input
+        return gzip.compress(data, compresslevel=6 if fast else 9, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate_encoding(accept_encodings) -> str:
+    """
+    Pick the best supported content-coding for a request.
+    accept_encodings is Flask's request.accept_encodings. Returns None for identity.
+    """
+    for encoding in SUPPORTED_ENCODINGS:
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
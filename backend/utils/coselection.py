@@ -0,0 +1,123 @@
+# backend/utils/coselection.py
+import itertools
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# NumPy is imported on first use (like the OAuth libraries) so it does not add
+# to worker start-up; without it co-selection analytics are unavailable.
+_np = None
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        import numpy
+        _np = numpy
+    return _np
+
+
+def numpy_available() -> bool:
+    try:
+        _numpy()
+    except ImportError:
+        return False
+    return True
+
+
+class CoSelectionMatrix:
+    """
+    Counts of candidates chosen together on the same ballot.
+
+    council[i, j] is the number of ballots with both i and j among the council
+    selections (the diagonal is each candidate's council votes), and
+    executive[i, j] the number with i on the council and j as an executive
+    officer. Rows and columns follow candidate_ids; ids not in that list are
+    ignored, as in the tally.
+
+    Ballots are added in batches as a product of one-hot matrices
+    (S.T @ S and S.T @ E, where S and E mark each ballot's council and
+    executive picks), so a full rebuild and a single new ballot use the same
+    code path. `ballots` is the number of ballots counted so far, which lets
+    the caller feed in only the ones committed since the last update.
+    """
+
+    def __init__(self, candidate_ids: Sequence[int]):
+        np = _numpy()
+        self.candidate_ids = list(candidate_ids)
+        self._column = {cid: i for i, cid in enumerate(self.candidate_ids)}
+        self._lookup = np.full(max([cid + 1 for cid in self.candidate_ids if cid >= 0], default=0), -1)
+        for cid, i in self._column.items():
+            if cid >= 0:
+                self._lookup[cid] = i
+        n = len(self.candidate_ids)
+        self.council = np.zeros((n, n), dtype=np.int64)
+        self.executive = np.zeros((n, n), dtype=np.int64)
+        self.ballots = 0
+        self._lock = threading.RLock()
+
+    def _one_hot(self, picks: List[List[int]]):
+        np = _numpy()
+        matrix = np.zeros((len(picks), len(self.candidate_ids)), dtype=np.float32)
+        lengths = np.fromiter((len(ids) for ids in picks), dtype=np.int64, count=len(picks))
+        ids = np.fromiter(itertools.chain.from_iterable(picks), dtype=np.int64, count=int(lengths.sum()))
+        rows = np.repeat(np.arange(len(picks)), lengths)
+        # Map candidate ids to columns; unknown ids map to -1 and are dropped
+        known = (ids >= 0) & (ids < len(self._lookup))
+        cols = np.full(len(ids), -1)
+        cols[known] = self._lookup[ids[known]]
+        keep = cols >= 0
+        matrix[rows[keep], cols[keep]] = 1
+        return matrix
+
+    def add_ballots(self, ballots: List[Tuple[List[int], List[int]]]):
+        """Count a batch of (selected_candidates, executive_candidates) pairs."""
+        if not ballots:
+            return
+        selected = self._one_hot([b[0] for b in ballots])
+        executive = self._one_hot([b[1] for b in ballots])
+        # float32 products are exact for batches of up to 2**24 ballots
+        council_part = (selected.T @ selected).round().astype('int64')
+        executive_part = (selected.T @ executive).round().astype('int64')
+        with self._lock:
+            self.council += council_part
+            self.executive += executive_part
+            self.ballots += len(ballots)
+
+    def _top(self, row, k: int, exclude: Optional[int]) -> List[Tuple[int, int]]:
+        np = _numpy()
+        counts = row.copy()
+        if exclude is not None:
+            counts[exclude] = -1
+        # Highest counts first; ties broken by candidate order
+        order = np.argsort(-counts, kind='stable')[:k]
+        return [(self.candidate_ids[j], int(counts[j])) for j in order if counts[j] > 0]
+
+    def top_pairs(self, k: int = 5, candidate_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        For each candidate (or just candidate_id): its council votes and the k
+        candidates most often picked alongside it, for the council and for
+        the executive. O(candidates^2 log candidates); no ballots are read.
+        """
+        with self._lock:
+            council = self.council.copy()
+            executive = self.executive.copy()
+        if candidate_id is not None:
+            columns = [self._column[candidate_id]] if candidate_id in self._column else []
+        else:
+            columns = range(len(self.candidate_ids))
+        rows = []
+        for i in columns:
+            votes = int(council[i, i])
+            rows.append({
+                'id': self.candidate_ids[i],
+                'councilVotes': votes,
+                'council': [
+                    {'id': cid, 'count': count, 'share': round(count / votes, 4)}
+                    for cid, count in self._top(council[i], k, exclude=i)
+                ],
+                'executive': [
+                    {'id': cid, 'count': count, 'share': round(count / votes, 4)}
+                    for cid, count in self._top(executive[i], k, exclude=i)
+                ]
+            })
+        return rows
@@ -1,36 +1,28 @@
 # backend/utils/data_handler.py
 import os
 import json
-from typing import List, Dict, Any
-# --- FIX: Remove duplicate sys import and correct path handling ---
-# The sys.path.append line is generally not recommended in utility modules like this.
-# The correct way is to ensure the package structure or use relative imports if within a package.
-# For now, assuming models.py is in the same backend directory and this file is correctly imported.
-# If there are import issues, they should be resolved by the project structure or PYTHONPATH.
-# from models import Candidate, Vote, VotesData, ElectionStatus
-# from config import Config
-
-# --- TEMPORARY FIX FOR IMPORTS (Assuming models.py and config.py are siblings to this file) ---
-# Adjust the import path as needed based on your actual project structure.
-# If this file is at backend/utils/data_handler.py and models.py is at backend/models.py:
-import sys
-import os
-# Get the directory of the current file (utils/)
-current_dir = os.path.dirname(os.path.abspath(__file__))
-# Get the parent directory (backend/)
-backend_dir = os.path.dirname(current_dir)
-# Add backend/ to sys.path so we can import models and config
-sys.path.append(backend_dir)
-# Now import
-from models import Candidate, Vote, VotesData, ElectionStatus
-from config import Config
-# --- END TEMPORARY FIX ---
+import threading
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from ..models import Candidate, Vote, VotesData, ElectionStatus, Election
+from ..config import Config
+from .shared_state import SharedElectionState
+from .merkle import BallotLedger
+from .vote_log import ShardedVoteLog
+from .coselection import CoSelectionMatrix, numpy_available
 
 DATA_FOLDER = Config.DATA_FOLDER
 
-def _read_json_file(filename: str) -> Any:
+# Per-thread count of data files parsed, so a request can measure its own reads
+_file_reads = threading.local()
+
+def json_file_reads() -> int:
+    """Number of JSON data files read so far by the calling thread."""
+    return getattr(_file_reads, 'count', 0)
+
+def _read_json_file(filename: str, folder: str = DATA_FOLDER) -> Any:
     """Read data from a JSON file."""
-    file_path = os.path.join(DATA_FOLDER, filename)
+    _file_reads.count = json_file_reads() + 1
+    file_path = os.path.join(folder, filename)
     try:
         with open(file_path, 'r') as f:
             return json.load(f)
@@ -74,72 +66,446 @@ def _read_json_file(filename: str) -> Any:
             return None # For unknown files, keep original behavior
         # --- END ROBUSTNESS FIX ---
 
-def _write_json_file(filename: str, data: Any) -> bool:
-    """Write data to a JSON file."""
-    file_path = os.path.join(DATA_FOLDER, filename)
+def _write_json_file(filename: str, data: Any, durable: bool = False, folder: str = DATA_FOLDER) -> bool:
+    """
+    Write data to a JSON file.
+    With durable=True the data is fsync'ed to a temporary file and atomically
+    renamed over the target, so a crash never leaves a half-written file.
+    """
+    file_path = os.path.join(folder, filename)
     try:
-        with open(file_path, 'w') as f:
+        if not durable:
+            with open(file_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            return True
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
         return True
     except Exception as e:
         print(f"Error writing to {filename}: {e}")
         return False
 
-def get_candidates() -> List[Candidate]:
-    """Get all candidates from the data file."""
-    data = _read_json_file('candidates.json')
+def get_data_version(filename: str, election_id: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Return an opaque version token for a data file (mtime and size).
+    Used as a cache key for responses derived from the file.
+    """
+    folder = get_election_folder(election_id) if election_id else DATA_FOLDER
+    try:
+        stat = os.stat(os.path.join(folder, filename))
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+# --- Elections ---
+# Each election is a partition with its own folder: the default election uses
+# data/ itself (the original single-election layout), others live in
+# data/elections/<id>/. A partition holds candidates.json, election.json
+# (title and ballot rules), the status file and shared counters, the vote log
+# shards and the ballot ledger. Nothing in a partition is opened until a
+# request for that election needs it, and every cache key includes its id.
+
+DEFAULT_ELECTION_ID = Config.DEFAULT_ELECTION_ID
+ELECTIONS_FOLDER = os.path.join(DATA_FOLDER, 'elections')
+_ELECTION_ID_CHARS = set('abcdefghijklmnopqrstuvwxyz0123456789-_')
+
+class _ElectionPartition:
+    """Per-election stores, each created on first use."""
+
+    def __init__(self, election_id: str, folder: str):
+        self.election_id = election_id
+        self.folder = folder
+        self.lock = threading.RLock()
+        self.vote_log = None
+        self.state = None
+        self.ledger = None
+        self.ledger_behind = False  # A committed ballot failed to reach the ledger
+        self.coselection = None
+        self.coselection_lock = threading.Lock()
+        self.config = None  # (election.json version, Election)
+        self.candidates = None  # (candidates.json version, [Candidate] or None)
+
+_partitions: Dict[str, _ElectionPartition] = {}
+_partitions_lock = threading.Lock()
+
+def is_valid_election_id(election_id: str) -> bool:
+    """Lowercase letters, digits, '-' and '_' (ids double as folder names)."""
+    return 0 < len(election_id) <= 64 and set(election_id) <= _ELECTION_ID_CHARS and election_id[0] not in '-_'
+
+def get_election_folder(election_id: str) -> str:
+    if election_id == DEFAULT_ELECTION_ID:
+        return DATA_FOLDER
+    return os.path.join(ELECTIONS_FOLDER, election_id)
+
+def election_exists(election_id: str) -> bool:
+    if election_id == DEFAULT_ELECTION_ID:
+        return True
+    return is_valid_election_id(election_id) and os.path.isfile(
+        os.path.join(ELECTIONS_FOLDER, election_id, 'election.json'))
+
+def _partition(election_id: str) -> _ElectionPartition:
+    partition = _partitions.get(election_id)
+    if partition is None:
+        with _partitions_lock:
+            partition = _partitions.get(election_id)
+            if partition is None:
+                if not election_exists(election_id):
+                    raise KeyError(f"Unknown election: {election_id}")
+                partition = _ElectionPartition(election_id, get_election_folder(election_id))
+                _partitions[election_id] = partition
+    return partition
+
+def get_election(election_id: str = DEFAULT_ELECTION_ID) -> Election:
+    """Election settings from its election.json (defaults from Config), reloaded when the file changes."""
+    partition = _partition(election_id)
+    version = get_data_version('election.json', election_id)
+    cached = partition.config
+    if cached is None or cached[0] != version:
+        data = _read_json_file('election.json', partition.folder)
+        data = data if isinstance(data, dict) else {}
+        election = Election(
+            id=election_id,
+            title=data.get('title') or (Config.DEFAULT_ELECTION_TITLE if election_id == DEFAULT_ELECTION_ID else election_id),
+            max_selections=int(data.get('max_selections') or Config.MAX_SELECTIONS),
+            max_executives=int(data.get('max_executives') or Config.MAX_EXECUTIVES)
+        )
+        partition.config = cached = (version, election)
+    return cached[1]
+
+def list_elections() -> List[Election]:
+    """The default election followed by the others, sorted by id."""
+    ids = [DEFAULT_ELECTION_ID]
+    if os.path.isdir(ELECTIONS_FOLDER):
+        ids.extend(sorted(
+            name for name in os.listdir(ELECTIONS_FOLDER)
+            if name != DEFAULT_ELECTION_ID and election_exists(name)
+        ))
+    return [get_election(election_id) for election_id in ids]
+
+def create_election(election: Election, candidates: List[Dict[str, Any]], is_open: bool = False) -> bool:
+    """Create a new election partition. Returns False if the id is invalid or taken."""
+    if not is_valid_election_id(election.id) or election_exists(election.id):
+        return False
+    folder = get_election_folder(election.id)
+    try:
+        os.makedirs(folder, exist_ok=True)
+    except OSError as e:
+        print(f"Error creating election folder {folder}: {e}")
+        return False
+    # election.json is written last: the election exists once it is in place
+    return (_write_json_file('candidates.json', candidates, durable=True, folder=folder) and
+            _write_json_file('election_status.json', {'is_open': is_open}, durable=True, folder=folder) and
+            _write_json_file('election.json', {
+                'title': election.title,
+                'max_selections': election.max_selections,
+                'max_executives': election.max_executives
+            }, durable=True, folder=folder))
+
+# --- Candidates and ballots ---
+
+def _load_candidates(folder: str) -> Optional[List[Candidate]]:
+    """Parse candidates.json; None if it does not hold a list."""
+    data = _read_json_file('candidates.json', folder)
     print(f"DEBUG: get_candidates received data of type: {type(data)}") # Debug log
     # --- REDUNDANCY CHECK (shouldn't be needed with fixes above, but good practice) ---
     if data is None or not isinstance(data, list):
         print("DEBUG: get_candidates returning empty list because data is None or not a list")
-        return []
+        return None
     # --- END REDUNDANCY CHECK ---
     # Ensure each item is a dict before trying to unpack it (extra safety)
     valid_items = [item for item in data if isinstance(item, dict)]
     print(f"DEBUG: get_candidates processing {len(valid_items)} valid candidate items")
     return [Candidate(**item) for item in valid_items]
 
-def get_votes() -> VotesData:
-    """Get all votes and voter IDs from the data file."""
-    data = _read_json_file('votes.json')
-    if data is None:
-        return VotesData(voter_ids=[], votes=[])
-    
-    # Ensure data has the expected structure
-    if not isinstance(data, dict) or 'votes' not in data or 'voter_ids' not in data:
-        print("WARNING: votes.json has unexpected structure. Returning empty VotesData.")
-        return VotesData(voter_ids=[], votes=[])
-        
-    votes = [Vote(**vote_data) for vote_data in data.get('votes', []) if isinstance(vote_data, dict)]
-    return VotesData(voter_ids=data.get('voter_ids', []), votes=votes)
-
-def save_votes(votes_data: VotesData) -> bool:
-    """Save votes and voter IDs to the data file."""
+def get_candidates(election_id: str = DEFAULT_ELECTION_ID) -> List[Candidate]:
+    """Get all candidates from the data file (parsed again only when it changes)."""
+    partition = _partition(election_id)
+    version = get_data_version('candidates.json', election_id)
+    cached = partition.candidates
+    if cached is None or cached[0] != version:
+        cached = (version, _load_candidates(partition.folder))
+        partition.candidates = cached
+    if cached[1] is None:
+        return []
+    candidates = list(cached[1])
+    # Keep the shared turnout counter in step with what was loaded
+    if partition.state is not None:
+        partition.state.set_candidate_count(len(candidates))
+    return candidates
+
+def get_vote_log(election_id: str = DEFAULT_ELECTION_ID) -> ShardedVoteLog:
+    """
+    Return an election's ballot store, creating it on first use:
+    Config.VOTE_LOG_SHARDS indexed logs in its folder, partitioned by voter ID.
+    An existing store keeps its recorded shard count (see backend/reshard.py).
+    An existing votes.json is imported into it once.
+    """
+    partition = _partition(election_id)
+    if partition.vote_log is None:
+        with partition.lock:
+            if partition.vote_log is None:
+                log = ShardedVoteLog(partition.folder, Config.VOTE_LOG_SHARDS)
+                if log.shard_count != Config.VOTE_LOG_SHARDS:
+                    print(f"Vote store for election {election_id} has {log.shard_count} shard(s), "
+                          f"VOTE_LOG_SHARDS is {Config.VOTE_LOG_SHARDS}; run backend.reshard to change it")
+                def load_legacy_votes():
+                    data = _read_json_file('votes.json', partition.folder)
+                    if not isinstance(data, dict):
+                        return []
+                    return [vote for vote in data.get('votes', []) if isinstance(vote, dict)]
+                log.seed(load_legacy_votes)
+                partition.vote_log = log
+    return partition.vote_log
+
+def get_votes_version(election_id: str = DEFAULT_ELECTION_ID) -> Tuple[int, int]:
+    """Opaque version token of an election's vote store (changes on every committed ballot)."""
+    return get_vote_log(election_id).version()
+
+def get_votes(election_id: str = DEFAULT_ELECTION_ID) -> VotesData:
+    """Get all votes and voter IDs (parses every shard; prefer the targeted helpers below)."""
+    votes = [Vote(**vote_data) for vote_data in get_vote_log(election_id)]
+    return VotesData(voter_ids=[vote.voter_id for vote in votes], votes=votes)
+
+def get_vote_count(election_id: str = DEFAULT_ELECTION_ID) -> int:
+    """Number of committed ballots. O(1)."""
+    return len(get_vote_log(election_id))
+
+def get_votes_page(cursor: Optional[str], limit: int,
+                   election_id: str = DEFAULT_ELECTION_ID) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Up to limit ballots after an export cursor (None for the first page), in
+    timestamp order, and the cursor of the next page (None after the last).
+    Only the ballots on the page are parsed. Raises ValueError for a bad cursor.
+    """
+    return get_vote_log(election_id).page(cursor, limit)
+
+def get_vote_by_id(vote_id: str, election_id: str = DEFAULT_ELECTION_ID) -> Optional[Dict[str, Any]]:
+    """A single ballot by its vote id, or None."""
+    return get_vote_log(election_id).read_by_id(vote_id)
+
+def has_voter_voted(voter_id: str, election_id: str = DEFAULT_ELECTION_ID) -> bool:
+    """Whether voter_id has a committed ballot (the voter's shard's in-memory index)."""
+    return get_vote_log(election_id).has_voter(voter_id)
+
+def ballot_chunk_ranges(chunk_size: int = 50000, election_id: str = DEFAULT_ELECTION_ID) -> List[Tuple[int, int, int]]:
+    """Split the vote store into (shard, start, stop) position ranges for load_ballot_chunk."""
+    return get_vote_log(election_id).chunk_ranges(chunk_size)
+
+def load_ballot_chunk(bounds: Tuple[int, int, int],
+                      election_id: str = DEFAULT_ELECTION_ID) -> List[Tuple[List[int], List[int]]]:
+    """
+    (selected_candidates, executive_candidates) pairs for one range of a shard.
+    Parses only that range, so worker processes can each load their own chunk.
+    """
+    shard, start, stop = bounds
+    return [
+        (vote.get('selected_candidates', []), vote.get('executive_candidates', []))
+        for vote in get_vote_log(election_id).shards[shard].read_range(start, stop)
+    ]
+
+def iter_ballot_chunks(chunk_size: int = 50000, votes_file: Optional[str] = None,
+                       election_id: str = DEFAULT_ELECTION_ID) -> Iterator[List[Tuple[List[int], List[int]]]]:
+    """
+    Yield ballots in chunks of (selected_candidates, executive_candidates) pairs,
+    in commit order. By default they are read from the election's vote log;
+    votes_file can point at an export from /api/admin/export (same layout as
+    votes.json).
+    """
+    if votes_file is None:
+        for bounds in ballot_chunk_ranges(chunk_size, election_id):
+            yield load_ballot_chunk(bounds, election_id)
+        return
+    with open(votes_file, 'r') as f:
+        data = json.load(f)
+    ballots = [
+        (vote.get('selected_candidates', []), vote.get('executive_candidates', []))
+        for vote in data.get('votes', []) if isinstance(vote, dict)
+    ]
+    for start in range(0, len(ballots), chunk_size):
+        yield ballots[start:start + chunk_size]
+
+def iter_vote_chunks(chunk_size: int = 50000,
+                     election_id: str = DEFAULT_ELECTION_ID) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield an election's ballots (vote dicts) chunk_size at a time, shard by
+    shard rather than in timestamp order. The ranges are fixed when iteration
+    starts, so ballots committed meanwhile are left out.
+    """
+    log = get_vote_log(election_id)
+    for shard, start, stop in log.chunk_ranges(chunk_size):
+        yield log.shards[shard].read_range(start, stop)
+
+def save_votes(votes_data: VotesData, election_id: str = DEFAULT_ELECTION_ID) -> bool:
+    """Replace an election's vote store with votes_data."""
     # Ensure votes_data is a VotesData instance before calling to_dict
     if not isinstance(votes_data, VotesData):
          print("ERROR: save_votes called with non-VotesData object")
          return False
-    return _write_json_file('votes.json', votes_data.to_dict())
-
-def get_election_status() -> ElectionStatus:
-    """Get the current election status."""
-    data = _read_json_file('election_status.json')
-    if data is None:
-        return ElectionStatus(is_open=True)
-    
-    # Ensure data is a dict before unpacking
+    log = get_vote_log(election_id)
+    try:
+        log.rewrite([vote.to_dict() for vote in votes_data.votes])
+    except Exception as e:
+        print(f"Error writing the vote log: {e}")
+        return False
+    # Maintain the shared ballot counter on commit
+    _get_election_state(election_id).set_vote_count(lambda: (len(log), log.version()))
+    return True
+
+# --- Status, counters and ledger ---
+
+def _load_election_status_file(folder: str) -> Dict[str, Any]:
+    """Read election_status.json, falling back to the default (open) status."""
+    data = _read_json_file('election_status.json', folder)
     if not isinstance(data, dict):
-        print("WARNING: election_status.json has unexpected structure. Returning default status.")
-        return ElectionStatus(is_open=True)
-        
-    return ElectionStatus(**data)
+        print("WARNING: election_status.json has unexpected structure. Using default status.")
+        return {"is_open": True}
+    return data
 
-def save_election_status(status: ElectionStatus) -> bool:
-    """Save the election status to the data file."""
+def _get_election_state(election_id: str = DEFAULT_ELECTION_ID) -> SharedElectionState:
+    """Return an election's process-wide shared status provider, creating it on first use."""
+    partition = _partition(election_id)
+    if partition.state is None:
+        with partition.lock:
+            if partition.state is None:
+                folder = partition.folder
+                state = SharedElectionState(
+                    os.path.join(folder, 'election_status.shm'),
+                    load_durable=lambda: _load_election_status_file(folder),
+                    save_durable=lambda data: _write_json_file('election_status.json', data, durable=True, folder=folder)
+                )
+                partition.state = state
+                # Refresh the ballot counter only if the vote log changed since it was last written
+                log = get_vote_log(election_id)
+                if tuple(state.votes_version()) != log.version():
+                    state.set_vote_count(lambda: (len(log), log.version()))
+                get_candidates(election_id)  # Sets the candidate counter
+    return partition.state
+
+def get_ballot_ledger(election_id: str = DEFAULT_ELECTION_ID) -> BallotLedger:
+    """
+    Return an election's Merkle ledger of committed ballots, creating it on
+    first use. Ballots in the vote log that are missing from the ledger (e.g.
+    recorded before it existed, or whose append failed) are appended in
+    timestamp order.
+    """
+    partition = _partition(election_id)
+    if partition.ledger is None:
+        with partition.lock:
+            if partition.ledger is None:
+                ledger = BallotLedger(os.path.join(partition.folder, 'ballot_hashes.log'))
+                log = get_vote_log(election_id)
+                if ledger.size < len(log):
+                    ledger.append_many(list(log))  # Ballots already in the tree are skipped
+                partition.ledger = ledger
+    elif partition.ledger_behind:
+        with partition.lock:
+            if partition.ledger_behind:
+                try:
+                    partition.ledger.append_many(list(get_vote_log(election_id)))
+                    partition.ledger_behind = False
+                except Exception as e:
+                    print(f"Error catching up the ballot ledger: {e}")
+    return partition.ledger
+
+def add_leaf_indexes(votes: List[Dict[str, Any]], election_id: str = DEFAULT_ELECTION_ID) -> List[Dict[str, Any]]:
+    """
+    Set each exported ballot's 'leaf_index', its position in the Merkle tree
+    (None if not recorded yet), so an offline audit can rebuild the tree in
+    the ledger's order rather than the export's timestamp order.
+    """
+    indexes = get_ballot_ledger(election_id).leaf_indexes(vote['id'] for vote in votes)
+    for vote, index in zip(votes, indexes):
+        vote['leaf_index'] = index
+    return votes
+
+def get_coselection(chunk_size: int = 50000, election_id: str = DEFAULT_ELECTION_ID,
+                    rebuild: bool = True) -> Optional[CoSelectionMatrix]:
+    """
+    Return an election's candidate co-selection matrix, brought up to date with
+    its vote log: only ballots committed since the last call are counted. It is
+    rebuilt from scratch when candidates.json changes. With rebuild=False a
+    missing or outdated matrix is left alone and None returned. None if NumPy
+    is not installed.
+    """
+    if not numpy_available():
+        return None
+    partition = _partition(election_id)
+    with partition.coselection_lock:
+        candidates_version = get_data_version('candidates.json', election_id)
+        if partition.coselection is None or partition.coselection[0] != candidates_version:
+            if not rebuild:
+                return None
+            matrix = CoSelectionMatrix([c.id for c in get_candidates(election_id)])
+            partition.coselection = (candidates_version, matrix, [0] * len(get_vote_log(election_id).shards))
+        _, matrix, counted = partition.coselection  # counted: ballots taken from each shard
+        for shard, log in enumerate(get_vote_log(election_id).shards):
+            total = len(log)
+            for start in range(counted[shard], total, chunk_size):
+                stop = min(start + chunk_size, total)
+                matrix.add_ballots(load_ballot_chunk((shard, start, stop), election_id))
+                counted[shard] = stop
+        return matrix
+
+def append_vote(vote: Vote, election_id: str = DEFAULT_ELECTION_ID) -> bool:
+    """
+    Commit a ballot to its voter's shard and record it in the ballot ledger.
+    Returns False if it could not be saved, or if the voter already has a
+    ballot (checked under the shard's lock).
+    """
+    log = get_vote_log(election_id)
+    try:
+        if not log.append_unique(vote.to_dict()):
+            return False
+    except Exception as e:
+        print(f"Error appending to the vote log: {e}")
+        return False
+    # Maintain the shared ballot counter on commit
+    _get_election_state(election_id).set_vote_count(lambda: (len(log), log.version()))
+    try:
+        get_ballot_ledger(election_id).append(vote.to_dict())
+    except Exception as e:
+        # The ballot is committed; the next ledger read backfills it from the vote log
+        print(f"Error recording ballot {vote.id} in the ledger: {e}")
+        _partition(election_id).ledger_behind = True
+    if _partition(election_id).coselection is not None:
+        # Count the new ballot while it is still in the page cache; rebuilds are
+        # left to the analytics endpoint, and a failure here must not fail the vote
+        try:
+            get_coselection(election_id=election_id, rebuild=False)
+        except Exception as e:
+            print(f"Error updating the co-selection matrix: {e}")
+            _partition(election_id).coselection = None  # Rebuilt on the next analytics request
+    return True
+
+def get_election_status(election_id: str = DEFAULT_ELECTION_ID) -> ElectionStatus:
+    """Get the current election status (served from shared memory)."""
+    return ElectionStatus(is_open=_get_election_state(election_id).is_open())
+
+def save_election_status(status: ElectionStatus, election_id: str = DEFAULT_ELECTION_ID) -> bool:
+    """Save the election status to the data file and publish it to all workers."""
     # Ensure status is an ElectionStatus instance before calling to_dict
     if not isinstance(status, ElectionStatus):
          print("ERROR: save_election_status called with non-ElectionStatus object")
          return False
-    return _write_json_file('election_status.json', status.to_dict())
+    return _get_election_state(election_id).set_open(status.is_open)
+
+def get_turnout_stats(election_id: str = DEFAULT_ELECTION_ID) -> Dict[str, int]:
+    """
+    Total candidates and ballots, read from the shared counters.
+    O(1): does not load candidates.json or the vote log.
+    """
+    total_votes, total_candidates = _get_election_state(election_id).counters()
+    return {'totalCandidates': total_candidates, 'totalVotes': total_votes}
+
+def flip_election_status(election_id: str = DEFAULT_ELECTION_ID) -> Optional[ElectionStatus]:
+    """Atomically toggle the election status. Returns the new status, or None on failure."""
+    new_value = _get_election_state(election_id).toggle()
+    if new_value is None:
+        return None
+    return ElectionStatus(is_open=new_value)
 
 # --- END OF FILE ---
@@ -0,0 +1,82 @@
+# backend/utils/io_pool.py
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict
+
+
+class IOPoolBusy(Exception):
+    """Raised when every worker and queue slot of an IOPool is taken."""
+
+
+class IOPoolTimeout(Exception):
+    """Raised when a call on an IOPool does not finish within its timeout."""
+
+
+class IOPool:
+    """
+    A small, dedicated thread pool for blocking network calls (e.g. the Google
+    OAuth round-trips made during login).
+
+    At most `workers` calls run at once and at most `max_pending` more wait for
+    a worker; further calls are refused immediately with IOPoolBusy rather
+    than queueing. A caller waits at most `timeout` seconds for its result and
+    then gets IOPoolTimeout. A call that overruns keeps its slot until it
+    actually returns, so a slow upstream can never tie up more than
+    workers + max_pending request threads, however many logins arrive.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float, name: str = 'io'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        # Metrics
+        self.in_flight = 0
+        self.completed_total = 0
+        self.rejected_total = 0
+        self.timeout_total = 0
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed_total += 1
+        self._slots.release()
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn(*args, **kwargs) on the pool and return its result (or raise its exception)."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected_total += 1
+            raise IOPoolBusy()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Drop it if it never started; otherwise it finishes in the background
+            future.cancel()
+            with self._lock:
+                self.timeout_total += 1
+            raise IOPoolTimeout()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'maxPending': self.max_pending,
+            'timeoutSeconds': self.timeout,
+            'inFlight': self.in_flight,
+            'completedTotal': self.completed_total,
+            'rejectedTotal': self.rejected_total,
+            'timeoutTotal': self.timeout_total
+        }
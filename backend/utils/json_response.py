@@ -0,0 +1,87 @@
+# backend/utils/json_response.py
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from flask import Response, request
+
+from .compression import compress, negotiate_encoding
+
+try:
+    import orjson
+except ImportError:  # Optional fast path; the stdlib encoder is used otherwise
+    orjson = None
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize payload to compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class JSONResponder:
+    """
+    Builds JSON API responses with negotiated gzip/brotli compression.
+
+    Bodies smaller than min_size are sent as-is. Payloads that are immutable for
+    a given cache_key (e.g. the candidate list for one version of
+    candidates.json) are serialized and compressed once per encoding and kept
+    in a small LRU cache, so repeat requests cost a dictionary lookup. The
+    cache holds at most cache_entries bodies and cache_bytes bytes in total;
+    encoded bodies larger than cache_max_body (e.g. a full ballot export) are
+    never cached.
+    """
+
+    def __init__(self, min_size: int = 1024, cache_entries: int = 64,
+                 cache_bytes: int = 16 * 1024 * 1024, cache_max_body: int = 1024 * 1024):
+        self.min_size = min_size
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self.cache_max_body = min(cache_max_body, cache_bytes)
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _encode(self, body: bytes, encoding: Optional[str], fast: bool) -> Tuple[bytes, Optional[str]]:
+        if encoding is None or len(body) < self.min_size:
+            return body, None
+        return compress(body, encoding, fast=fast), encoding
+
+    def _build(self, body: bytes, encoding: Optional[str], status: int) -> Response:
+        response = Response(body, status=status, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    def cached(self, cache_key, status: int = 200) -> Optional[Response]:
+        """Return a response from the cache for this request's encoding, or None on a miss."""
+        encoding = negotiate_encoding(request.accept_encodings)
+        with self._lock:
+            entry = self._cache.get((cache_key, encoding))
+            if entry is None:
+                return None
+            self._cache.move_to_end((cache_key, encoding))
+        body, applied = entry
+        return self._build(body, applied, status)
+
+    def respond(self, payload: Any, status: int = 200, cache_key=None) -> Response:
+        """
+        Serialize payload and compress it if the client accepts it.
+        With a cache_key, the encoded body is cached for later cached() calls.
+        """
+        encoding = negotiate_encoding(request.accept_encodings)
+        body, applied = self._encode(dumps(payload), encoding, fast=cache_key is None)
+        if cache_key is not None and len(body) <= self.cache_max_body:
+            with self._lock:
+                previous = self._cache.pop((cache_key, encoding), None)
+                if previous is not None:
+                    self._cached_bytes -= len(previous[0])
+                self._cache[(cache_key, encoding)] = (body, applied)
+                self._cached_bytes += len(body)
+                while len(self._cache) > self.cache_entries or self._cached_bytes > self.cache_bytes:
+                    _, (evicted, _) = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return self._build(body, applied, status)
@@ -0,0 +1,220 @@
+# backend/utils/merkle.py
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from .shared_state import file_lock
+
+# Hashing follows RFC 6962 (Certificate Transparency): leaves and interior
+# nodes use different prefixes, so a leaf can never be passed off as a node.
+HASH_SIZE = 32
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(b'\x00' + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def ballot_leaf(vote: Dict[str, Any]) -> bytes:
+    """Leaf hash of a ballot: its canonical JSON (sorted keys, no whitespace)."""
+    canonical = json.dumps(vote, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return leaf_hash(canonical.encode('utf-8'))
+
+
+def _split(size: int) -> int:
+    """Largest power of two strictly smaller than size (size >= 2)."""
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+def root_from_leaves(leaves: List[bytes]) -> bytes:
+    """Merkle root of a full list of leaf hashes (for offline audits)."""
+    if not leaves:
+        return hashlib.sha256(b'').digest()
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split(len(leaves))
+    return node_hash(root_from_leaves(leaves[:k]), root_from_leaves(leaves[k:]))
+
+
+def verify_inclusion(leaf: bytes, index: int, tree_size: int, path: List[bytes], root: bytes) -> bool:
+    """Check an inclusion proof (RFC 9162, section 2.1.3.2)."""
+    if index >= tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    r = leaf
+    for p in path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+class BallotLedger:
+    """
+    Append-only Merkle tree over committed ballots.
+
+    Leaf hashes are appended to a log file (one "<vote id> <hex hash>" line per
+    ballot), which every worker replays incrementally, so all processes build
+    the same tree in the same order. In memory the tree is kept as one packed
+    bytearray of 32-byte hashes per level, where levels[k] holds the roots of
+    the complete subtrees of 2**k leaves: appending a ballot is O(log n), and
+    the root or an inclusion proof takes O(log^2 n) without rehashing ballots.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock_path = path + '.lock'
+        self._lock = threading.RLock()
+        self._levels: List[bytearray] = [bytearray()]
+        self._index: Dict[str, int] = {}
+        self._offset = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.refresh()
+
+    @property
+    def size(self) -> int:
+        return len(self._levels[0]) // HASH_SIZE
+
+    def _node(self, level: int, i: int) -> bytes:
+        return bytes(self._levels[level][i * HASH_SIZE:(i + 1) * HASH_SIZE])
+
+    def _add_leaf(self, leaf: bytes):
+        """Add a leaf and complete any subtrees it closes: O(log n)."""
+        self._levels[0] += leaf
+        level = 0
+        while (len(self._levels[level]) // HASH_SIZE) % 2 == 0:
+            count = len(self._levels[level]) // HASH_SIZE
+            parent = node_hash(self._node(level, count - 2), self._node(level, count - 1))
+            if len(self._levels) == level + 1:
+                self._levels.append(bytearray())
+            self._levels[level + 1] += parent
+            level += 1
+
+    def refresh(self):
+        """Replay leaves appended to the log (by any worker) since the last call."""
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            end = data.rfind(b'\n') + 1  # Ignore a line that is still being written
+            for line in data[:end].splitlines():
+                vote_id, hex_hash = line.decode('ascii').split(' ')
+                self._index[vote_id] = self.size
+                self._add_leaf(bytes.fromhex(hex_hash))
+            self._offset += end
+
+    def append_many(self, ballots: List[Dict[str, Any]]):
+        """Record committed ballots (dicts with an 'id'). Ballots already in the tree are skipped."""
+        with self._lock, file_lock(self._lock_path):
+            self.refresh()
+            lines = [
+                f"{vote['id']} {ballot_leaf(vote).hex()}\n"
+                for vote in ballots if vote['id'] not in self._index
+            ]
+            if lines:
+                with open(self.path, 'a') as f:
+                    f.write(''.join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.refresh()
+
+    def append(self, vote: Dict[str, Any]):
+        self.append_many([vote])
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        """Hash of leaves [start, end), using stored complete subtrees where possible."""
+        size = end - start
+        if size & (size - 1) == 0 and start % size == 0:
+            return self._node(size.bit_length() - 1, start // size)
+        k = _split(size)
+        return node_hash(self._subtree(start, start + k), self._subtree(start + k, end))
+
+    def _path(self, m: int, start: int, end: int) -> List[bytes]:
+        """Audit path for leaf start+m within [start, end) (RFC 6962 PATH)."""
+        size = end - start
+        if size == 1:
+            return []
+        k = _split(size)
+        if m < k:
+            return self._path(m, start, start + k) + [self._subtree(start + k, end)]
+        return self._path(m - k, start + k, end) + [self._subtree(start, start + k)]
+
+    def leaf_indexes(self, vote_ids: Iterable[str]) -> List[Optional[int]]:
+        """Leaf index of each ballot (None for ballots not in the tree yet)."""
+        with self._lock:
+            self.refresh()
+            return [self._index.get(vote_id) for vote_id in vote_ids]
+
+    def root(self) -> str:
+        """Current Merkle root (hex)."""
+        with self._lock:
+            self.refresh()
+            if self.size == 0:
+                return hashlib.sha256(b'').hexdigest()
+            return self._subtree(0, self.size).hex()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            root = self.root()
+            return {'merkleRoot': root, 'treeSize': self.size}
+
+    def inclusion_proof(self, vote_id: str) -> Optional[Dict[str, Any]]:
+        """Inclusion proof for a ballot against the current root, or None if unknown."""
+        with self._lock:
+            self.refresh()
+            index = self._index.get(vote_id)
+            if index is None:
+                return None
+            size = self.size
+            return {
+                'voteId': vote_id,
+                'leafIndex': index,
+                'treeSize': size,
+                'leafHash': self._node(0, index).hex(),
+                'auditPath': [h.hex() for h in self._path(index, 0, size)],
+                'merkleRoot': self._subtree(0, size).hex()
+            }
+
+
+def export_root(votes: List[Dict[str, Any]]) -> str:
+    """
+    Merkle root (hex) of exported ballots. The export is in timestamp order,
+    which need not be the order ballots entered the tree, so leaves are taken
+    in leaf_index order; the leaf_index field itself is not part of the ballot
+    hash. Ballots without a leaf_index are not in the tree and are skipped.
+    """
+    ordered = sorted((vote for vote in votes if vote.get('leaf_index') is not None),
+                     key=lambda vote: vote['leaf_index'])
+    if [vote['leaf_index'] for vote in ordered] != list(range(len(ordered))):
+        raise ValueError('leaf indexes are not 0..n-1: the export is incomplete or altered')
+    return root_from_leaves([
+        ballot_leaf({key: value for key, value in vote.items() if key != 'leaf_index'}) for vote in ordered
+    ]).hex()
+
+
+if __name__ == '__main__':
+    # Offline audit of an export (GET /api/admin/export saved to a file):
+    #   python -m backend.utils.merkle votes_export.json
+    with open(sys.argv[1]) as f:
+        export = json.load(f)
+    untracked = sum(1 for vote in export['votes'] if vote.get('leaf_index') is None)
+    if untracked:
+        print(f"{untracked} ballot(s) not yet in the tree", file=sys.stderr)
+    print(export_root(export['votes']))
@@ -0,0 +1,164 @@
+# backend/utils/photos.py
+import hashlib
+import io
+import os
+import threading
+import urllib.request
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Optional: without Pillow candidate photos keep their original URLs
+    Image = None
+
+# Thumbnail variants, in order of preference: (format, file extension, mimetype)
+THUMBNAIL_FORMATS = (
+    ('WEBP', '.webp', 'image/webp'),
+    ('JPEG', '.jpg', 'image/jpeg'),
+)
+
+
+def _fetch_url(url: str) -> bytes:
+    """Download an image (http(s):// or file:// URL)."""
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read()
+
+
+class PhotoCache:
+    """
+    Local store of fixed-size candidate photo thumbnails.
+
+    Each source URL is downloaded once and stored as WebP and JPEG thumbnails
+    named after a hash of the URL and size, so the local URL (/photos/<key>)
+    never changes content and can be cached by browsers indefinitely. Disk usage
+    is capped at max_bytes; the least recently served photos (by file mtime,
+    which is shared by every worker) are evicted first.
+    """
+
+    def __init__(self, cache_dir: str, size: int = 160, max_bytes: int = 50 * 1024 * 1024,
+                 fetch: Optional[Callable[[str], bytes]] = None):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_bytes = max_bytes
+        self._fetch = fetch or _fetch_url
+        self._lock = threading.Lock()
+        self._sources: Dict[str, str] = {}  # key -> original URL
+        # Bumped whenever the set of cached photos changes (part of response cache keys)
+        self.generation = 0
+        self.formats = [f for f in THUMBNAIL_FORMATS if f[0] != 'WEBP' or self._webp_supported()]
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def available() -> bool:
+        """Thumbnails need Pillow."""
+        return Image is not None
+
+    @staticmethod
+    def _webp_supported() -> bool:
+        return Image is not None and features.check('webp')
+
+    def key_for(self, url: str) -> str:
+        """Stable cache key for a source URL at this thumbnail size."""
+        return hashlib.sha256(f"{self.size}:{url}".encode('utf-8')).hexdigest()[:20]
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, key + ext)
+
+    def is_cached(self, url: str) -> bool:
+        key = self.key_for(url)
+        return all(os.path.exists(self._path(key, ext)) for _, ext, _ in self.formats)
+
+    def local_url(self, url: str) -> Optional[str]:
+        """Return the local URL for a cached photo, or None if it has not been ingested."""
+        if not url:
+            return None
+        key = self.key_for(url)
+        self._sources.setdefault(key, url)
+        if not self.is_cached(url):
+            return None
+        return f"/photos/{key}"
+
+    def ingest(self, url: str) -> bool:
+        """Download a photo once and write its thumbnails. Returns True if it is cached."""
+        if not url or Image is None:
+            return False
+        key = self.key_for(url)
+        self._sources[key] = url
+        if self.is_cached(url):
+            return True
+        try:
+            image = Image.open(io.BytesIO(self._fetch(url)))
+            thumbnail = ImageOps.fit(image.convert('RGB'), (self.size, self.size))
+            for fmt, ext, _ in self.formats:
+                buffer = io.BytesIO()
+                thumbnail.save(buffer, fmt, quality=82, optimize=True)
+                tmp_path = f"{self._path(key, ext)}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(buffer.getvalue())
+                os.replace(tmp_path, self._path(key, ext))
+        except Exception as e:
+            print(f"Error caching photo {url}: {e}")
+            return False
+        with self._lock:
+            self.generation += 1
+        self.evict()
+        return True
+
+    def ingest_all(self, urls: Iterable[str]) -> int:
+        """Ingest every URL that is not cached yet. Returns the number of cached photos."""
+        cached = sum(1 for url in urls if self.ingest(url))
+        with self._lock:
+            # Another worker may have written some of the files; refresh cache keys regardless
+            self.generation += 1
+        return cached
+
+    def resolve(self, key: str, accept_mimetypes) -> Optional[tuple]:
+        """
+        Return (file_path, mimetype) of the best thumbnail for a request, or None.
+        accept_mimetypes is Flask's request.accept_mimetypes. Marks the photo as used.
+        """
+        for _, ext, mimetype in self.formats:
+            path = self._path(key, ext)
+            if mimetype != 'image/jpeg' and accept_mimetypes[mimetype] <= 0:
+                continue  # JPEG is the universal fallback
+            if os.path.exists(path):
+                try:
+                    os.utime(path)  # LRU bookkeeping
+                except OSError:
+                    pass
+                return path, mimetype
+        return None
+
+    def source_url(self, key: str) -> Optional[str]:
+        """Original URL for a key seen by this process (used when a photo was evicted)."""
+        return self._sources.get(key)
+
+    def disk_usage(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.is_file())
+
+    def evict(self) -> int:
+        """Delete least recently used photos until the cache fits in max_bytes. Returns photos removed."""
+        with self._lock:
+            groups = {}
+            for entry in os.scandir(self.cache_dir):
+                if not entry.is_file() or entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                key = os.path.splitext(entry.name)[0]
+                size, mtime, paths = groups.get(key, (0, 0, []))
+                groups[key] = (size + stat.st_size, max(mtime, stat.st_mtime), paths + [entry.path])
+            total = sum(size for size, _, _ in groups.values())
+            removed = 0
+            for key, (size, _, paths) in sorted(groups.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                removed += 1
+            if removed:
+                self.generation += 1
+        return removed
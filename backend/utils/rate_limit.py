@@ -0,0 +1,157 @@
+# backend/utils/rate_limit.py
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+
+def parse_rate(spec: str) -> Tuple[float, int]:
+    """
+    Parse a limit like '10/60' (10 requests per 60 seconds).
+    Returns (refill rate in tokens per second, burst size).
+    """
+    count, seconds = spec.split('/')
+    count, seconds = int(count), float(seconds)
+    return count / seconds, count
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket rate limiter keyed by an arbitrary string (client + route).
+
+    Each key holds up to `burst` tokens refilled at `rate` per second; a request
+    spends one token. With backend='memory' buckets live in this process. With
+    backend='sqlite' they live in a local SQLite database so every worker on
+    the machine shares the same counters.
+    """
+
+    # Idle in-memory buckets are dropped after this many seconds (they would be full anyway)
+    IDLE_SECONDS = 3600
+
+    def __init__(self, backend: str = 'memory', path: str = None):
+        self.backend = backend
+        self.allowed_total = 0
+        self.limited_total = 0
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._last_prune = time.monotonic()
+        if backend == 'sqlite':
+            self.path = path
+            self._local = threading.local()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS buckets ('
+                    ' key TEXT PRIMARY KEY,'
+                    ' tokens REAL NOT NULL,'
+                    ' updated_at REAL NOT NULL)'
+                )
+        elif backend != 'memory':
+            raise ValueError(f"Unknown rate limit backend: {backend}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # Counters are disposable
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _spend(tokens: float, updated_at: float, now: float, rate: float, burst: int):
+        """Refill a bucket and try to take one token. Returns (allowed, new_tokens, retry_after)."""
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        if tokens >= 1:
+            return True, tokens - 1, 0.0
+        return False, tokens, (1 - tokens) / rate
+
+    def acquire(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Spend a token for key. Returns (allowed, seconds until a token is available)."""
+        if self.backend == 'sqlite':
+            allowed, retry_after = self._acquire_sqlite(key, rate, burst)
+        else:
+            allowed, retry_after = self._acquire_memory(key, rate, burst)
+        with self._lock:
+            if allowed:
+                self.allowed_total += 1
+            else:
+                self.limited_total += 1
+        return allowed, retry_after
+
+    def _acquire_memory(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            allowed, tokens, retry_after = self._spend(tokens, updated_at, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            if now - self._last_prune > 60:
+                self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < self.IDLE_SECONDS}
+                self._last_prune = now
+        return allowed, retry_after
+
+    def _acquire_sqlite(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated_at = row if row else (burst, now)
+            allowed, tokens, retry_after = self._spend(tokens, updated_at, now, rate, burst)
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            if self.allowed_total % 1000 == 0:
+                conn.execute('DELETE FROM buckets WHERE updated_at < ?', (now - self.IDLE_SECONDS,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def stats(self) -> Dict[str, int]:
+        return {'allowedTotal': self.allowed_total, 'limitedTotal': self.limited_total}
+
+
+class ConcurrencyGate:
+    """
+    Caps the number of requests inside a section (e.g. write endpoints) per process.
+    Callers that don't get a slot are turned away immediately instead of queueing.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected_total = 0
+
+    def try_enter(self) -> bool:
+        if not self._semaphore.acquire(blocking=False):
+            with self._lock:
+                self.rejected_total += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'maxConcurrent': self.max_concurrent,
+            'inFlight': self.in_flight,
+            'rejectedTotal': self.rejected_total
+        }
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After takes whole seconds."""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,69 @@
+# backend/utils/request_context.py
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+
+class DataContext:
+    """
+    Unit of work for a single request.
+
+    get(source, loader, *args) calls loader(*args) the first time a source is
+    asked for with those arguments and returns the same object afterwards, so
+    a handler and the decorators in front of it share one snapshot of each
+    source and never load it twice. After a write, invalidate() the sources
+    it changed. Loads are counted per source; file_reads is the number of
+    data files actually parsed since the context was opened (from a per-thread
+    counter such as data_handler.json_file_reads).
+    """
+
+    def __init__(self, read_counter: Optional[Callable[[], int]] = None):
+        self._values: Dict[tuple, Any] = {}
+        self._read_counter = read_counter
+        self._reads_at_start = read_counter() if read_counter else 0
+        self.loads = Counter()
+        self.hits = 0
+
+    def get(self, source: str, loader: Callable[..., Any], *args) -> Any:
+        key = (source,) + args
+        if key in self._values:
+            self.hits += 1
+            return self._values[key]
+        self.loads[source] += 1
+        value = loader(*args)
+        self._values[key] = value
+        return value
+
+    def invalidate(self, source: str, *args):
+        self._values.pop((source,) + args, None)
+
+    @property
+    def file_reads(self) -> int:
+        return self._read_counter() - self._reads_at_start if self._read_counter else 0
+
+
+class DataContextStats:
+    """Per-endpoint totals of the loads, hits and file reads of finished requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, context: DataContext):
+        file_reads = context.file_reads
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'loads': 0, 'hits': 0, 'fileReads': 0, 'maxFileReads': 0
+            })
+            totals['requests'] += 1
+            totals['loads'] += sum(context.loads.values())
+            totals['hits'] += context.hits
+            totals['fileReads'] += file_reads
+            totals['maxFileReads'] = max(totals['maxFileReads'], file_reads)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                endpoint: {**totals, 'fileReadsPerRequest': round(totals['fileReads'] / totals['requests'], 2)}
+                for endpoint, totals in sorted(self._endpoints.items())
+            }
@@ -0,0 +1,130 @@
+# backend/utils/shared_state.py
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from typing import Callable, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: no cross-process locking
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path: str):
+    """Hold an exclusive advisory lock on lock_path (serializes worker processes)."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SharedElectionState:
+    """
+    Election status shared by every worker process through a memory-mapped file.
+
+    The file is mapped MAP_SHARED, so a write from one worker is visible to all
+    the others on their next read, and a read is a single memory load instead of
+    parsing election_status.json. The JSON file remains the durable copy: writes
+    go to it first (fsync + atomic rename) and only then flip the shared flag.
+
+    The mapping also holds turnout counters (total ballots and candidates), so
+    stats can be reported without loading the ballot data. The ballot counter
+    is stored with the version (mtime, size) of the vote file it describes,
+    which lets a starting worker detect that it is stale and recount.
+    """
+
+    MAGIC = b'PHX2'
+    # magic, is_open, (pad), total_votes, total_candidates, votes file mtime_ns, votes file size
+    _LAYOUT = struct.Struct('<4sB3xQQqq')
+    _IS_OPEN_OFFSET = 4
+    _COUNTERS = struct.Struct('<QQ')
+    _COUNTERS_OFFSET = 8
+    _VOTES_VERSION = struct.Struct('<qq')
+    _VOTES_VERSION_OFFSET = 24
+
+    def __init__(self, path: str, load_durable, save_durable):
+        """
+        path          -- file backing the shared mapping (created if missing)
+        load_durable  -- callable returning the persisted status dict
+        save_durable  -- callable(dict) -> bool persisting the status
+        """
+        self.path = path
+        self._load_durable = load_durable
+        self._save_durable = save_durable
+        self._lock_path = path + '.lock'
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < self._LAYOUT.size:
+                os.ftruncate(fd, self._LAYOUT.size)
+            self._mm = mmap.mmap(fd, self._LAYOUT.size)
+        finally:
+            os.close(fd)
+
+        # Seed the shared copy from disk; the durable file is authoritative
+        # at start-up (e.g. after an edit while the service was down).
+        with self._locked():
+            data = self._load_durable() or {}
+            if self._mm[:4] != self.MAGIC:
+                # New file or older layout: counters are unknown until recounted
+                self._LAYOUT.pack_into(self._mm, 0, self.MAGIC, 0, 0, 0, -1, -1)
+            self._mm[self._IS_OPEN_OFFSET] = 1 if data.get('is_open', True) else 0
+
+    def _locked(self):
+        """Serialize writers across processes with an advisory file lock."""
+        return file_lock(self._lock_path)
+
+    def is_open(self) -> bool:
+        """Return the current status (a memory read, no file I/O)."""
+        return self._mm[self._IS_OPEN_OFFSET] != 0
+
+    def set_open(self, is_open: bool) -> bool:
+        """Persist the new status, then publish it to every worker."""
+        with self._locked():
+            if not self._save_durable({'is_open': bool(is_open)}):
+                return False
+            self._mm[self._IS_OPEN_OFFSET] = 1 if is_open else 0
+        return True
+
+    def toggle(self):
+        """Atomically flip the status. Returns the new value, or None on failure."""
+        with self._locked():
+            new_value = not self.is_open()
+            if not self._save_durable({'is_open': new_value}):
+                return None
+            self._mm[self._IS_OPEN_OFFSET] = 1 if new_value else 0
+        return new_value
+
+    # --- Turnout counters ---
+
+    def counters(self):
+        """Return (total_votes, total_candidates) from shared memory."""
+        return self._COUNTERS.unpack_from(self._mm, self._COUNTERS_OFFSET)
+
+    def votes_version(self):
+        """Version (mtime_ns, size) of the vote file the ballot counter was taken from."""
+        return self._VOTES_VERSION.unpack_from(self._mm, self._VOTES_VERSION_OFFSET)
+
+    def set_vote_count(self, read_count: Callable[[], Tuple[int, Tuple[int, int]]]):
+        """
+        Record the ballot count and the version of the vote file it was taken
+        from, as returned by read_count(). The count is read under the lock, so
+        a writer that read it earlier can never overwrite a newer count.
+        """
+        with self._locked():
+            total_votes, votes_version = read_count()
+            struct.pack_into('<Q', self._mm, self._COUNTERS_OFFSET, total_votes)
+            self._VOTES_VERSION.pack_into(self._mm, self._VOTES_VERSION_OFFSET, *votes_version)
+
+    def set_candidate_count(self, total_candidates: int):
+        """Record the number of candidates (updated whenever candidates are loaded)."""
+        # A single aligned 8-byte store; no lock needed
+        struct.pack_into('<Q', self._mm, self._COUNTERS_OFFSET + 8, total_candidates)
@@ -0,0 +1,48 @@
+# backend/utils/tally.py
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Counting rules shared by /api/results and the offline recount:
+#   - every id in selected_candidates earns one council vote
+#   - every id in executive_candidates earns one executive vote
+#   - ids that are not in the candidate list are ignored
+#   - results are ranked by council votes, then executive votes (both descending)
+
+
+def tally_ballots(ballots: Iterable[Tuple[List[int], List[int]]]) -> Tuple[Counter, Counter, int]:
+    """
+    Count (selected_candidates, executive_candidates) pairs.
+    Returns (council counts, executive counts, number of ballots).
+    """
+    council = Counter()
+    executive = Counter()
+    total = 0
+    for selected, executives in ballots:
+        council.update(selected)
+        executive.update(executives)
+        total += 1
+    return council, executive, total
+
+
+def merge_tallies(parts: Iterable[Tuple[Counter, Counter, int]]) -> Tuple[Counter, Counter, int]:
+    """Combine partial tallies (e.g. one per chunk)."""
+    council = Counter()
+    executive = Counter()
+    total = 0
+    for part_council, part_executive, part_total in parts:
+        council.update(part_council)
+        executive.update(part_executive)
+        total += part_total
+    return council, executive, total
+
+
+def rank_results(candidates: List[Dict[str, Any]], council: Counter, executive: Counter) -> List[Dict[str, Any]]:
+    """Attach vote counts to candidate dicts and sort them into the published order."""
+    results = [{
+        **candidate,
+        'councilVotes': council.get(candidate['id'], 0),
+        'executiveVotes': executive.get(candidate['id'], 0)
+    } for candidate in candidates]
+    # Sort by council votes DESC, then executive votes DESC
+    results.sort(key=lambda x: (x['councilVotes'], x['executiveVotes']), reverse=True)
+    return results
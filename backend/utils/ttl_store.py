@@ -0,0 +1,112 @@
+# backend/utils/ttl_store.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class TTLStore:
+    """
+    Small key/value store with per-entry expiry, shared by all worker processes.
+
+    Backed by a SQLite database in WAL mode, so any worker can read what another
+    worker wrote. Memory and disk use are bounded: expired entries are purged
+    periodically and, once max_entries is exceeded, the entries closest to
+    expiry are evicted first.
+    """
+
+    # Run the purge/eviction pass every this many writes
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, ttl: float, max_entries: int = 100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def put(self, key: str, value: str = '', ttl: Optional[float] = None):
+        """Insert or replace an entry that expires after ttl seconds (default: store TTL)."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, expires_at)
+            )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge()
+
+    def add(self, key: str, value: str = '', ttl: Optional[float] = None) -> bool:
+        """Insert an entry only if key is absent or expired. Returns False if a live entry exists."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM entries WHERE key = ? AND expires_at <= ?', (key, now))
+            added = conn.execute(
+                'INSERT OR IGNORE INTO entries (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, expires_at)
+            ).rowcount == 1
+        if added:
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self.purge()
+        return added
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for key, or None if it is missing or expired."""
+        row = self._connection().execute(
+            'SELECT value FROM entries WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def delete(self, key: str):
+        """Remove an entry if present."""
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def __len__(self) -> int:
+        """Number of stored entries (including ones that expired but were not purged yet)."""
+        return self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def purge(self) -> int:
+        """Delete expired entries and enforce max_entries. Returns the number removed."""
+        conn = self._connection()
+        with conn:
+            removed = conn.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(),)).rowcount
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    'DELETE FROM entries WHERE key IN '
+                    '(SELECT key FROM entries ORDER BY expires_at LIMIT ?)',
+                    (overflow,)
+                ).rowcount
+        return removed
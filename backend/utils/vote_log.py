@@ -0,0 +1,461 @@
+# backend/utils/vote_log.py
+import hashlib
+import heapq
+import itertools
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .shared_state import file_lock
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: no cross-process locking
+    fcntl = None
+
+
+def vote_id_digest(vote_id: str) -> bytes:
+    """Fixed-width (16-byte) key for a vote id, as stored in the index."""
+    return hashlib.sha256(vote_id.encode('utf-8')).digest()[:16]
+
+
+class VoteLog:
+    """
+    Append-only ballot log with a fixed-width line-offset index.
+
+    The log holds one ballot per line as compact JSON (votes.log). The index
+    (votes.idx) holds one 24-byte record per ballot: the byte offset of its
+    line and a digest of its vote id. Both files are read through mmap, so
+    ballot i is found with one seek into the index and one slice of the log,
+    without parsing anything else. A ballot counts as committed once its index
+    record is written, so the ballot count is the index size divided by 24.
+
+    Appends from any worker are serialized with a file lock. Each process keeps
+    its in-memory lookups (vote id -> position, voter ids) up to date by
+    reading only the index records added since its last look.
+    """
+
+    RECORD = struct.Struct('<Q16s')  # line offset, vote id digest
+
+    def __init__(self, log_path: str, index_path: str):
+        self.log_path = log_path
+        self.index_path = index_path
+        self._lock_path = log_path + '.lock'
+        self._lock = threading.RLock()
+        self._maps = {}  # path -> (mmap, mapped length, inode)
+        # Lazily built, incrementally refreshed lookups
+        self._positions: Dict[bytes, int] = {}
+        self._positions_seen = 0
+        self._voter_ids: Set[str] = set()
+        self._voter_ids_seen = 0
+        self._index_ino = None
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        for path in (log_path, index_path):
+            if not os.path.exists(path):
+                open(path, 'ab').close()
+
+    # --- Low-level access ---
+
+    def __len__(self) -> int:
+        """Number of committed ballots: O(1), a stat of the index."""
+        return os.path.getsize(self.index_path) // self.RECORD.size
+
+    def version(self):
+        """Opaque token that changes whenever a ballot is committed (cache key)."""
+        stat = os.stat(self.index_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _map(self, path: str, min_length: int):
+        """
+        Return a read-only mmap of path covering at least min_length bytes.
+        Remaps when the file has grown past the mapping or been replaced by rewrite().
+        """
+        with self._lock:
+            stat = os.stat(path)
+            mapped = self._maps.get(path)
+            if mapped is None or mapped[2] != stat.st_ino or mapped[1] < min_length:
+                if stat.st_size == 0:
+                    return b''
+                with open(path, 'rb') as f:
+                    mapped = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), stat.st_size, stat.st_ino)
+                self._maps[path] = mapped
+            return mapped[0]
+
+    def _sync_lookups(self):
+        """Forget the in-memory lookups if another worker has rewritten the log."""
+        ino = os.stat(self.index_path).st_ino
+        if ino != self._index_ino:
+            self._positions, self._positions_seen = {}, 0
+            self._voter_ids, self._voter_ids_seen = set(), 0
+            self._index_ino = ino
+
+    def _record(self, position: int):
+        index = self._map(self.index_path, (position + 1) * self.RECORD.size)
+        return self.RECORD.unpack_from(index, position * self.RECORD.size)
+
+    def _line(self, offset: int) -> bytes:
+        log = self._map(self.log_path, offset + 1)
+        end = log.find(b'\n', offset)
+        if end < 0:
+            log = self._map(self.log_path, len(log) + 1)
+            end = log.find(b'\n', offset)
+        return log[offset:end]
+
+    # --- Reads ---
+
+    def read(self, position: int) -> Dict[str, Any]:
+        """Ballot at a position (0-based, commit order): O(1)."""
+        if position < 0 or position >= len(self):
+            raise IndexError(position)
+        offset, _ = self._record(position)
+        return json.loads(self._line(offset))
+
+    def read_raw_range(self, start: int, stop: int) -> bytes:
+        """Raw JSON lines for ballots [start, stop) in one slice of the log."""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return b''
+        first, _ = self._record(start)
+        last, _ = self._record(stop - 1)
+        log = self._map(self.log_path, last + 1)
+        end = log.find(b'\n', last)
+        return log[first:end + 1]
+
+    def read_range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Ballots [start, stop), parsing only those lines."""
+        return [json.loads(line) for line in self.read_raw_range(start, stop).splitlines()]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        total = len(self)
+        for start in range(0, total, 10000):
+            yield from self.read_range(start, min(start + 10000, total))
+
+    def position_of(self, vote_id: str) -> Optional[int]:
+        """Position of a ballot by vote id: O(1) after the index has been loaded once."""
+        with self._lock:
+            self._sync_lookups()
+            total = len(self)
+            if self._positions_seen < total:
+                index = self._map(self.index_path, total * self.RECORD.size)
+                for position in range(self._positions_seen, total):
+                    _, digest = self.RECORD.unpack_from(index, position * self.RECORD.size)
+                    self._positions[digest] = position
+                self._positions_seen = total
+            return self._positions.get(vote_id_digest(vote_id))
+
+    def read_by_id(self, vote_id: str) -> Optional[Dict[str, Any]]:
+        position = self.position_of(vote_id)
+        if position is None:
+            return None
+        vote = self.read(position)
+        return vote if vote.get('id') == vote_id else None
+
+    def voter_ids(self) -> Set[str]:
+        """Set of voter ids that have a committed ballot (parses only new ballots)."""
+        with self._lock:
+            self._sync_lookups()
+            total = len(self)
+            if self._voter_ids_seen < total:
+                for vote in self.read_range(self._voter_ids_seen, total):
+                    self._voter_ids.add(vote['voter_id'])
+                self._voter_ids_seen = total
+            return self._voter_ids
+
+    # --- Writes ---
+
+    def _encode(self, votes: List[Dict[str, Any]], offset: int) -> Tuple[bytes, bytes]:
+        """Log lines and index records for ballots written starting at byte offset."""
+        lines = []
+        records = []
+        for vote in votes:
+            line = json.dumps(vote, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+            records.append(self.RECORD.pack(offset, vote_id_digest(vote['id'])))
+            lines.append(line)
+            offset += len(line)
+        return b''.join(lines), b''.join(records)
+
+    def _committed_end(self) -> int:
+        """Byte offset just past the last committed line."""
+        total = len(self)
+        if total == 0:
+            return 0
+        offset, _ = self._record(total - 1)
+        return offset + len(self._line(offset)) + 1
+
+    def _append_locked(self, votes: List[Dict[str, Any]]):
+        # Drop a partial index record left by a writer that crashed mid-write;
+        # otherwise every record appended after it would be misaligned
+        index_size = os.path.getsize(self.index_path)
+        if index_size % self.RECORD.size:
+            os.truncate(self.index_path, index_size - index_size % self.RECORD.size)
+            self._maps.pop(self.index_path, None)
+        # Drop a tail left by a writer that crashed before committing its index records
+        end = self._committed_end()
+        if os.path.getsize(self.log_path) > end:
+            os.truncate(self.log_path, end)
+            self._maps.pop(self.log_path, None)
+
+        lines, records = self._encode(votes, end)
+        with open(self.log_path, 'ab') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.index_path, 'ab') as f:
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, votes: List[Dict[str, Any]]):
+        """Durably append ballots (log first, then the index records that commit them)."""
+        with self._lock, file_lock(self._lock_path):
+            self._append_locked(votes)
+
+    def append_unique(self, vote: Dict[str, Any]) -> bool:
+        """
+        Append a ballot unless its voter already has one. The check and the append
+        happen under the same lock, so concurrent submits cannot both get in.
+        """
+        with self._lock, file_lock(self._lock_path):
+            if vote['voter_id'] in self.voter_ids():
+                return False
+            self._append_locked([vote])
+            return True
+
+    def seed(self, load_votes: Callable[[], List[Dict[str, Any]]]) -> int:
+        """
+        Fill an empty log from load_votes() (one-time import of a legacy store).
+        Safe to call from every worker: only the first one to take the lock imports.
+        """
+        with self._lock, file_lock(self._lock_path):
+            if len(self) == 0:
+                votes = load_votes()
+                if votes:
+                    self._append_locked(votes)
+            return len(self)
+
+    def rewrite(self, votes: List[Dict[str, Any]]):
+        """Replace the whole log (used when the full vote list is saved)."""
+        with self._lock, file_lock(self._lock_path):
+            lines, records = self._encode(votes, 0)
+            for path, data in ((self.log_path, lines), (self.index_path, records)):
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            self._maps.clear()
+            self._sync_lookups()
+
+
+def shard_of(voter_id: str, shards: int) -> int:
+    """Shard holding a voter's ballot (stable across processes and restarts)."""
+    return zlib.crc32(voter_id.encode('utf-8')) % shards
+
+
+class StoreInUse(Exception):
+    """Raised by reshard() while another process has the vote store open."""
+
+
+def _shard_logs(folder: str, count: int) -> List[VoteLog]:
+    if count == 1:
+        return [VoteLog(os.path.join(folder, 'votes.log'), os.path.join(folder, 'votes.idx'))]
+    return [
+        VoteLog(os.path.join(folder, f'votes.{i}.log'), os.path.join(folder, f'votes.{i}.idx'))
+        for i in range(count)
+    ]
+
+
+def _partition(votes: Iterable[Dict[str, Any]], count: int) -> List[List[Dict[str, Any]]]:
+    parts = [[] for _ in range(count)]
+    for vote in votes:
+        parts[shard_of(vote['voter_id'], count)].append(vote)
+    return parts
+
+
+def _recorded_shard_count(folder: str) -> Optional[int]:
+    """Shard count from votes.shards; None if the store has no layout file yet."""
+    try:
+        with open(os.path.join(folder, 'votes.shards')) as f:
+            return int(f.read().strip() or 1)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        return 1
+
+
+def _record_shard_count(folder: str, count: int):
+    path = os.path.join(folder, 'votes.shards')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(str(count))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShardedVoteLog:
+    """
+    Vote store split into shard VoteLogs, partitioned by a hash of voter_id.
+
+    Each shard has its own files, file lock and voter-id index, so ballots
+    from voters on different shards commit in parallel, and a voter's
+    duplicate check only ever involves one shard. Reads merge the shards in
+    timestamp order. With one shard the files are votes.log / votes.idx;
+    otherwise votes.<i>.log / votes.<i>.idx.
+
+    The shard count is recorded in votes.shards and an existing store is
+    always opened with that count: `shards` only chooses the layout of a new
+    store (legacy stores without the file are a single log). Changing the
+    count of an existing store is a separate, offline step, reshard(). While
+    open, the store holds a shared lock on votes.active so that reshard() can
+    refuse to run under a live server or recount.
+    """
+
+    def __init__(self, folder: str, shards: int = 1):
+        self.folder = folder
+        self.requested_shards = max(1, shards)
+        os.makedirs(folder, exist_ok=True)
+        # Kept open (and share-locked) for the lifetime of the store
+        self._active = open(os.path.join(folder, 'votes.active'), 'a')
+        if fcntl is not None:
+            fcntl.flock(self._active, fcntl.LOCK_SH)
+        with file_lock(os.path.join(folder, 'votes.lock')):
+            count = _recorded_shard_count(folder)
+            if count is None:
+                legacy = os.path.exists(os.path.join(folder, 'votes.log'))
+                count = 1 if legacy else self.requested_shards
+                _record_shard_count(folder, count)
+            self.shard_count = count
+            self.shards = _shard_logs(folder, count)
+
+    def close(self):
+        """Release the in-use lock (also released when the process exits)."""
+        self._active.close()
+
+    def shard_for(self, voter_id: str) -> VoteLog:
+        return self.shards[shard_of(voter_id, self.shard_count)]
+
+    # --- Reads (merged across shards) ---
+
+    def __len__(self) -> int:
+        return sum(len(log) for log in self.shards)
+
+    def version(self) -> Tuple[int, int]:
+        """(latest index mtime, total index size): changes on every commit to any shard."""
+        versions = [log.version() for log in self.shards]
+        return (max(v[0] for v in versions), sum(v[1] for v in versions))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return heapq.merge(*self.shards, key=lambda vote: vote.get('timestamp', ''))
+
+    def has_voter(self, voter_id: str) -> bool:
+        return voter_id in self.shard_for(voter_id).voter_ids()
+
+    def read_by_id(self, vote_id: str) -> Optional[Dict[str, Any]]:
+        for log in self.shards:
+            vote = log.read_by_id(vote_id)
+            if vote is not None:
+                return vote
+        return None
+
+    def parse_cursor(self, cursor: Optional[str]) -> List[int]:
+        """
+        An export cursor is the next position in each shard, joined with '.'
+        (a plain integer with one shard). Raises ValueError if malformed.
+        """
+        if not cursor:
+            return [0] * self.shard_count
+        positions = [int(part) for part in cursor.split('.')]
+        if len(positions) != self.shard_count or min(positions) < 0:
+            raise ValueError(f"cursor must have {self.shard_count} non-negative positions")
+        return positions
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Up to limit ballots after cursor in timestamp order, and the cursor for the
+        next page (None when every shard has been read to its end). Ballots
+        committed later land after each shard's position, so none are skipped.
+        """
+        positions = self.parse_cursor(cursor)
+        windows = [
+            [(i, vote) for vote in log.read_range(position, position + limit)]
+            for i, (log, position) in enumerate(zip(self.shards, positions))
+        ]
+        merged = heapq.merge(*windows, key=lambda entry: entry[1].get('timestamp', ''))
+        votes = []
+        for i, vote in itertools.islice(merged, limit):
+            positions[i] += 1
+            votes.append(vote)
+        if all(position >= len(log) for log, position in zip(self.shards, positions)):
+            return votes, None
+        return votes, '.'.join(str(position) for position in positions)
+
+    def chunk_ranges(self, chunk_size: int) -> List[Tuple[int, int, int]]:
+        """(shard, start, stop) ranges covering every ballot, for parallel readers."""
+        ranges = []
+        for i, log in enumerate(self.shards):
+            total = len(log)
+            ranges.extend((i, start, min(start + chunk_size, total)) for start in range(0, total, chunk_size))
+        return ranges
+
+    # --- Writes ---
+
+    def append(self, vote: Dict[str, Any]):
+        self.shard_for(vote['voter_id']).append([vote])
+
+    def append_unique(self, vote: Dict[str, Any]) -> bool:
+        """Append a ballot unless its voter already has one (locks only the voter's shard)."""
+        return self.shard_for(vote['voter_id']).append_unique(vote)
+
+    def seed(self, load_votes: Callable[[], List[Dict[str, Any]]]) -> int:
+        """Fill an empty store from load_votes() (one-time import of a legacy store)."""
+        with file_lock(os.path.join(self.folder, 'votes.lock')):
+            if len(self) == 0:
+                votes = load_votes()
+                for log, part in zip(self.shards, _partition(votes, self.shard_count)):
+                    if part:
+                        log.append(part)
+            return len(self)
+
+    def rewrite(self, votes: List[Dict[str, Any]]):
+        for log, part in zip(self.shards, _partition(votes, self.shard_count)):
+            log.rewrite(part)
+
+
+def reshard(folder: str, shards: int) -> Tuple[int, int]:
+    """
+    Redistribute a store's ballots over `shards` logs and record the new
+    layout. Offline only: raises StoreInUse if any process (a server worker,
+    a recount) has the store open. Returns (previous shard count, ballots).
+    """
+    shards = max(1, shards)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'votes.active'), 'a') as active:
+        if fcntl is not None:
+            try:
+                fcntl.flock(active, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise StoreInUse(f"the vote store in {folder} is open in another process (is the server running?)")
+        with file_lock(os.path.join(folder, 'votes.lock')):
+            previous = _recorded_shard_count(folder) or 1
+            old_logs = _shard_logs(folder, previous)
+            votes = list(heapq.merge(*old_logs, key=lambda vote: vote.get('timestamp', '')))
+            if previous == shards:
+                return previous, len(votes)
+            new_logs = _shard_logs(folder, shards)
+            for log, part in zip(new_logs, _partition(votes, shards)):
+                log.rewrite(part)
+            # Record the new layout before removing the old files, so a crash in
+            # between leaves a readable (if untidy) store
+            _record_shard_count(folder, shards)
+            new_paths = {path for log in new_logs for path in (log.log_path, log.index_path)}
+            for log in old_logs:
+                for path in (log.log_path, log.index_path):
+                    if path not in new_paths and os.path.exists(path):
+                        os.remove(path)
+            return previous, len(votes)
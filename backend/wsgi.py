@@ -7,15 +7,15 @@ This file is used by PythonAnywhere to serve the Flask application.
 import sys
 import os
 
-# Add the current directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Add the project root (parent of backend/) to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
 # Import the Flask app
-from app import create_app
+from backend.app import create_app
 
 # Create the application instance
 application = create_app('production')
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Columnar ballot export (.npz, and Arrow IPC when pyarrow is installed) versus
+the CSV export.
+
+Writes --ballots synthetic ballots to a vote log in a temporary directory,
+then exports them the way /api/admin/export-columnar (chunks of --chunk-size
+from the log) and /api/admin/export-csv do. Reports each file's size, the
+time to write it and the time an analyst needs to load it: csv.reader over
+every row for the CSV, numpy.load of every array for the .npz and a
+memory-mapped read of every column for Arrow.
+
+Usage (from the project root):
+    python benchmarks/bench_columnar_export.py [--ballots 200000] [--chunk-size 50000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backend.utils.columnar_export import arrow_available, write_ballots_arrow, write_ballots_npz
+from backend.utils.vote_log import VoteLog
+
+
+def write_csv(path, log, names):
+    # Same layout as /api/admin/export-csv
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Voter ID'] + [f'Executive {i + 1}' for i in range(7)] + [f'Council {i + 1}' for i in range(8)])
+        for vote in log:
+            executives = set(vote['executive_candidates'])
+            council = [cid for cid in vote['selected_candidates'] if cid not in executives]
+            writer.writerow([vote['voter_id']] + [names[cid] for cid in vote['executive_candidates']] +
+                            [names[cid] for cid in council])
+
+
+def load_csv(path):
+    with open(path, newline='') as f:
+        return sum(1 for _ in csv.reader(f)) - 1
+
+
+def load_npz(path):
+    with np.load(path) as data:
+        return len({name: data[name] for name in data.files}['voter_id'])
+
+
+def load_arrow(path):
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        return table.num_rows
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ballots', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    candidate_ids = list(range(1, 43))
+    names = {cid: f'Candidate Number {cid}' for cid in candidate_ids}
+    with tempfile.TemporaryDirectory() as tmp:
+        log = VoteLog(os.path.join(tmp, 'votes.log'), os.path.join(tmp, 'votes.idx'))
+        votes = []
+        for i in range(args.ballots):
+            selected = random.sample(candidate_ids, 15)
+            votes.append({
+                'id': str(uuid.uuid4()),
+                'voter_id': f'{random.randrange(10 ** 20, 10 ** 21)}',
+                'selected_candidates': selected,
+                'executive_candidates': selected[:7],
+                'timestamp': '2024-01-01T00:00:00.000000Z'
+            })
+        log.append(votes)
+        del votes
+
+        def chunks():
+            for start in range(0, len(log), args.chunk_size):
+                yield log.read_range(start, min(start + args.chunk_size, len(log)))
+
+        candidates = sorted(names.items())
+        rows = []
+        path = os.path.join(tmp, 'votes.csv')
+        _, write_s = timed(write_csv, path, log, names)
+        count, load_s = timed(load_csv, path)
+        rows.append(('csv', os.path.getsize(path), write_s, load_s, count))
+
+        path = os.path.join(tmp, 'votes.npz')
+        with open(path, 'wb') as f:
+            _, write_s = timed(write_ballots_npz, f, chunks(), candidates, 'bench', 15, 7)
+        count, load_s = timed(load_npz, path)
+        rows.append(('npz', os.path.getsize(path), write_s, load_s, count))
+
+        if arrow_available():
+            path = os.path.join(tmp, 'votes.arrow')
+            with open(path, 'wb') as f:
+                _, write_s = timed(write_ballots_arrow, f, chunks(), candidates, 'bench', 15, 7)
+            count, load_s = timed(load_arrow, path)
+            rows.append(('arrow', os.path.getsize(path), write_s, load_s, count))
+
+        print(f"{args.ballots:,} ballots")
+        print(f"{'format':<7} {'size MB':>9} {'write s':>8} {'load s':>8} {'rows':>9}")
+        for name, size, write_s, load_s, count in rows:
+            print(f"{name:<7} {size / 1e6:>9.1f} {write_s:>8.2f} {load_s:>8.3f} {count:>9,}"
+                  f"{'' if count == args.ballots else '  MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
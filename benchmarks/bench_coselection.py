@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Co-selection matrix rebuild: one-hot matrix product versus a per-ballot loop.
+
+Builds the council x council and council x executive co-occurrence counts for
+--ballots synthetic ballots both ways, checks they agree, and times a single
+incremental update (one new ballot) through CoSelectionMatrix.add_ballots.
+
+Usage (from the project root):
+    python benchmarks/bench_coselection.py [--ballots 200000] [--chunk-size 50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.coselection import CoSelectionMatrix
+
+
+def loop_counts(ballots):
+    council, executive = Counter(), Counter()
+    for selected, executives in ballots:
+        for a in selected:
+            for b in selected:
+                council[a, b] += 1
+            for b in executives:
+                executive[a, b] += 1
+    return council, executive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ballots', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    candidate_ids = list(range(1, 43))
+    ballots = []
+    for _ in range(args.ballots):
+        selected = random.sample(candidate_ids, 15)
+        ballots.append((selected, random.sample(selected, 7)))
+
+    start = time.perf_counter()
+    matrix = CoSelectionMatrix(candidate_ids)
+    for i in range(0, len(ballots), args.chunk_size):
+        matrix.add_ballots(ballots[i:i + args.chunk_size])
+    product_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    council, executive = loop_counts(ballots)
+    loop_s = time.perf_counter() - start
+
+    consistent = all(
+        matrix.council[i, j] == council[a, b] and matrix.executive[i, j] == executive[a, b]
+        for i, a in enumerate(candidate_ids) for j, b in enumerate(candidate_ids)
+    )
+
+    start = time.perf_counter()
+    for ballot in ballots[:1000]:
+        matrix.add_ballots([ballot])
+    incremental_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(f"{args.ballots:,} ballots, {len(candidate_ids)} candidates")
+    print(f"one-hot product rebuild: {product_s:6.2f}s  ({args.ballots / product_s:>12,.0f} ballots/s)")
+    print(f"per-ballot loop rebuild: {loop_s:6.2f}s  ({args.ballots / loop_s:>12,.0f} ballots/s)"
+          f"{'' if consistent else '  MISMATCH'}")
+    print(f"incremental update:      {incremental_us:,.0f} us per ballot")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+JSON API payload benchmark: bytes on the wire and CPU per request.
+
+For the candidate list, a synthetic vote export and a synthetic results
+payload it reports:
+  - serialization time with the stdlib encoder and with orjson (if installed)
+  - body size uncompressed, gzip and brotli (if installed)
+It then times GET /api/candidates through the Flask test client, comparing
+plain jsonify with the compressed + cached JSONResponder path.
+
+Usage (from the project root):
+    python benchmarks/bench_json.py [--votes 20000] [--requests 500]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify
+
+from backend.app import create_app
+from backend.utils import json_response
+from backend.utils.compression import SUPPORTED_ENCODINGS, compress
+from backend.utils.data_handler import get_candidates
+
+
+def synthetic_export(candidate_ids, count):
+    votes = []
+    for _ in range(count):
+        selected = random.sample(candidate_ids, 15)
+        votes.append({
+            'id': str(uuid.uuid4()),
+            'voter_id': f"DEMO_USER_{uuid.uuid4().hex[:8].upper()}",
+            'selected_candidates': selected,
+            'executive_candidates': selected[:7],
+            'timestamp': '2024-01-01T00:00:00.000000Z'
+        })
+    return {'voter_ids': [v['voter_id'] for v in votes], 'votes': votes}
+
+
+def cpu_per_call(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1e6  # microseconds
+
+
+def report_payload(name, payload, repeat):
+    stdlib_us = cpu_per_call(lambda: json.dumps(payload, separators=(',', ':')).encode('utf-8'), repeat)
+    line = f"{name:<12} stdlib {stdlib_us:10.1f} us"
+    if json_response.orjson is not None:
+        orjson_us = cpu_per_call(lambda: json_response.orjson.dumps(payload), repeat)
+        line += f"   orjson {orjson_us:10.1f} us ({stdlib_us / orjson_us:4.1f}x)"
+    print(line)
+    body = json_response.dumps(payload)
+    sizes = [f"identity {len(body):>10,} B"]
+    for encoding in SUPPORTED_ENCODINGS:
+        sizes.append(f"{encoding} {len(compress(body, encoding)):>9,} B")
+    print(' ' * 13 + '   '.join(sizes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes', type=int, default=20000, help='ballots in the synthetic export payload')
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint timing')
+    args = parser.parse_args()
+
+    candidates = [c.to_dict() for c in get_candidates()]
+    candidate_ids = [c['id'] for c in candidates]
+    results = {
+        'isOpen': False,
+        'results': [{**c, 'councilVotes': random.randint(0, 10000), 'executiveVotes': random.randint(0, 5000)}
+                    for c in candidates],
+        'stats': {'totalCandidates': len(candidates), 'totalVotes': args.votes}
+    }
+
+    print("== Serialization and payload size ==")
+    report_payload('candidates', candidates, 2000)
+    report_payload('results', results, 2000)
+    report_payload('export', synthetic_export(candidate_ids, args.votes), 5)
+
+    print("\n== GET /api/candidates (CPU per request) ==")
+    app = create_app('production')
+    client = app.test_client()
+
+    @app.route('/bench/candidates-jsonify')
+    def candidates_jsonify():
+        return jsonify(candidates)
+
+    def fetch(path, encoding):
+        response = client.get(path, headers={'Accept-Encoding': encoding})
+        return response.headers.get('Content-Encoding'), len(response.data)
+
+    for encoding in ('identity',) + SUPPORTED_ENCODINGS:
+        applied, size = fetch('/bench/candidates-jsonify', encoding)
+        baseline_us = cpu_per_call(lambda: fetch('/bench/candidates-jsonify', encoding), args.requests)
+        applied, cached_size = fetch('/api/candidates', encoding)
+        cached_us = cpu_per_call(lambda: fetch('/api/candidates', encoding), args.requests)
+        print(f"Accept-Encoding {encoding:<8} jsonify {baseline_us:8.1f} us / {size:>7,} B   "
+              f"responder {cached_us:8.1f} us / {cached_size:>7,} B ({applied or 'identity'})")
+
+
+if __name__ == '__main__':
+    main()
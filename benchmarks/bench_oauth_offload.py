@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Vote submission latency during a Google sign-in surge, with the OAuth calls
+made on the request threads versus on the bounded OAuth pool.
+
+Starts a local mock OAuth provider (token endpoint and signing certificates,
+each answering after --latency seconds) and serves the app from a server with
+a fixed pool of --threads request threads, like a threaded production worker.
+--logins clients then hit /auth/google/callback back to back for --seconds
+while one client submits ballots to a temporary election and records how long
+each submission takes. Run once with OAUTH_POOL_WORKERS=0 (inline) and once
+with the pool settings from the command line.
+
+Usage (from the project root):
+    python benchmarks/bench_oauth_offload.py [--threads 8] [--logins 16] [--latency 0.5] [--seconds 10]
+                                             [--pool-workers 2] [--max-pending 2]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The mock provider speaks plain HTTP
+os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
+
+import requests
+import rsa
+from google.auth import crypt, jwt
+from werkzeug.serving import BaseWSGIServer
+
+from backend.app import create_app
+from backend.config import config
+from backend.models import Election
+from backend.utils.data_handler import create_election, get_election_folder
+
+CLIENT_ID = 'bench-client.apps.googleusercontent.com'
+KEY_ID = 'bench-key'
+
+
+def start_mock_provider(latency):
+    """Serve /token and /certs on an ephemeral port; returns (server, base URL)."""
+    public_key, private_key = rsa.newkeys(2048)
+    signer = crypt.RSASigner.from_string(private_key.save_pkcs1().decode(), key_id=KEY_ID)
+    certs = json.dumps({KEY_ID: public_key.save_pkcs1().decode()}).encode()
+    scope = 'openid https://www.googleapis.com/auth/userinfo.email https://www.googleapis.com/auth/userinfo.profile'
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, body, headers=()):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latency)
+            now = int(time.time())
+            user = uuid.uuid4().hex
+            id_token = jwt.encode(signer, {
+                'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'sub': user,
+                'email': f'{user}@example.com', 'email_verified': True, 'name': 'Bench User',
+                'iat': now, 'exp': now + 3600
+            }).decode()
+            self._send(json.dumps({
+                'access_token': user, 'id_token': id_token, 'token_type': 'Bearer',
+                'expires_in': 3600, 'scope': scope
+            }).encode())
+
+        def do_GET(self):
+            time.sleep(latency)
+            self._send(certs, [('Cache-Control', 'public, max-age=300')])
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass  # Clients that timed out and hung up
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """A WSGI server with a fixed number of request threads."""
+
+    def __init__(self, app, threads):
+        super().__init__('127.0.0.1', 0, app)
+        self._threads = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self._threads.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def run(args, provider_url, election_id, pool_workers):
+    # Config values are read from the environment at import; set them on the class instead
+    settings = config['development']
+    settings.OAUTH_POOL_WORKERS = pool_workers
+    settings.OAUTH_MAX_PENDING = args.max_pending
+    settings.OAUTH_TIMEOUT_SECONDS = args.timeout
+    settings.GOOGLE_CLIENT_ID = CLIENT_ID
+    settings.GOOGLE_TOKEN_URI = f'{provider_url}/token'
+    settings.GOOGLE_CERTS_URL = f'{provider_url}/certs'
+    settings.RATE_LIMIT_ENABLED = False
+    settings.STATELESS_SESSIONS = True
+    settings.PHOTO_CACHE_ENABLED = False
+    app = create_app('development')
+
+    server = PooledWSGIServer(app, args.threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    deadline = time.perf_counter() + args.seconds
+    logins = {}
+    login_lock = threading.Lock()
+
+    def login_loop():
+        while time.perf_counter() < deadline:
+            try:
+                status = requests.get(f'{base}/auth/google/callback?code=bench&state=x',
+                                      allow_redirects=False, timeout=60).status_code
+            except requests.RequestException:
+                status = 'error'
+            with login_lock:
+                logins[status] = logins.get(status, 0) + 1
+            if status == 503:
+                time.sleep(1)  # Retry-After
+
+    submit_ms = []
+
+    def submit_loop():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = requests.post(f'{base}/api/elections/{election_id}/votes/submit', json={
+                'selectedCandidates': [1, 2, 3], 'executiveCandidates': [1]
+            }, timeout=60)
+            submit_ms.append((time.perf_counter() - start) * 1000)
+            assert response.ok, response.text
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(args.logins)]
+    threads.append(threading.Thread(target=submit_loop))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+    return logins, submit_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8, help='request threads in the app server')
+    parser.add_argument('--logins', type=int, default=16, help='concurrent sign-in clients')
+    parser.add_argument('--latency', type=float, default=0.5, help='mock provider latency per call (s)')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--pool-workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=2)
+    parser.add_argument('--timeout', type=float, default=10)
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    provider, provider_url = start_mock_provider(args.latency)
+    election_id = f'bench-oauth-{uuid.uuid4().hex[:8]}'
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'backend', 'data', 'candidates.json')) as f:
+        candidates = json.load(f)
+    create_election(Election(election_id, 'OAuth benchmark', 3, 1), candidates, is_open=True)
+    try:
+        print(f"{args.threads} request threads, {args.logins} sign-in clients, "
+              f"{args.latency * 1000:.0f} ms provider latency, {args.seconds:.0f}s per run")
+        print(f"{'mode':<16} {'logins ok':>9} {'503':>6} {'504':>5} {'submits':>8} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, workers in (('inline', 0), (f'pool {args.pool_workers}+{args.max_pending}', args.pool_workers)):
+            logins, submit_ms = run(args, provider_url, election_id, workers)
+            p99 = statistics.quantiles(submit_ms, n=100, method='inclusive')[98] if len(submit_ms) > 1 else submit_ms[0]
+            print(f"{name:<16} {logins.get(302, 0):>9} {logins.get(503, 0):>6} {logins.get(504, 0):>5} "
+                  f"{len(submit_ms):>8} {statistics.median(submit_ms):>8.1f} {p99:>8.1f} {max(submit_ms):>8.1f}")
+    finally:
+        shutil.rmtree(get_election_folder(election_id), ignore_errors=True)
+        provider.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Throughput of the parallel offline recount (backend/recount.py).
+
+Writes a synthetic vote store with --ballots ballots to a temporary
+directory, then recounts it with increasing worker counts and reports
+ballots per second. Every run must produce identical totals.
+
+Usage (from the project root):
+    python benchmarks/bench_recount.py [--ballots 1000000] [--workers 1,2,4,8]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.recount import recount
+
+
+def write_synthetic_votes(path, count, candidate_ids):
+    with open(path, 'w') as f:
+        f.write('{"voter_ids": [], "votes": [')
+        for i in range(count):
+            selected = random.sample(candidate_ids, 15)
+            vote = {
+                'id': str(uuid.uuid4()),
+                'voter_id': f"DEMO_USER_{i:08X}",
+                'selected_candidates': selected,
+                'executive_candidates': selected[:7],
+                'timestamp': '2024-01-01T00:00:00.000000Z'
+            }
+            f.write((',' if i else '') + json.dumps(vote))
+        f.write(']}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ballots', type=int, default=1000000)
+    parser.add_argument('--workers', default=','.join(str(w) for w in sorted({1, 2, 4, os.cpu_count() or 1})))
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        votes_file = os.path.join(tmp, 'votes.json')
+        write_synthetic_votes(votes_file, args.ballots, list(range(1, 43)))
+        print(f"{args.ballots:,} ballots, {os.path.getsize(votes_file) / 1e6:.1f} MB")
+
+        reference = None
+        for workers in (int(w) for w in args.workers.split(',')):
+            council, executive, total, elapsed = recount(votes_file, workers, args.chunk_size)
+            if reference is None:
+                reference = (council, executive, total)
+            consistent = (council, executive, total) == reference
+            print(f"workers {workers:>3}: {elapsed:6.2f}s  {total / elapsed:>12,.0f} ballots/s"
+                  f"{'' if consistent else '  MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Phoenix backend.
+
+Each sample runs in a fresh interpreter (like a newly forked gunicorn or
+PythonAnywhere worker) and measures:
+  - the time to import backend.app
+  - the time to run create_app()
+It also checks that the Google OAuth stack is not imported during start-up.
+
+Usage (from the project root):
+    python benchmarks/bench_startup.py [--runs 10] [--max-ms 400]
+
+Exits with status 1 if the median start-up time exceeds --max-ms or if the
+OAuth modules were loaded eagerly, so it can be used as a regression gate.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a child interpreter; prints one JSON line with the timings.
+CHILD_SCRIPT = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from backend.app import create_app
+t1 = time.perf_counter()
+create_app('production')
+t2 = time.perf_counter()
+eager = sorted(m for m in ('google_auth_oauthlib', 'google.oauth2', 'requests') if m in sys.modules)
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'create_app_ms': (t2 - t1) * 1000, 'eager_modules': eager}))
+"""
+
+
+def run_sample():
+    output = subprocess.check_output(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        cwd=PROJECT_ROOT,
+        stderr=subprocess.DEVNULL
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='number of fresh interpreters to sample')
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if median import + create_app exceeds this')
+    args = parser.parse_args()
+
+    samples = [run_sample() for _ in range(args.runs)]
+    import_ms = [s['import_ms'] for s in samples]
+    create_ms = [s['create_app_ms'] for s in samples]
+    total_ms = [i + c for i, c in zip(import_ms, create_ms)]
+    eager = sorted({m for s in samples for m in s['eager_modules']})
+
+    print(f"runs:            {args.runs}")
+    print(f"import (median): {statistics.median(import_ms):8.1f} ms")
+    print(f"create_app:      {statistics.median(create_ms):8.1f} ms")
+    print(f"total (median):  {statistics.median(total_ms):8.1f} ms   (max {max(total_ms):.1f} ms)")
+    print(f"eager OAuth modules: {', '.join(eager) if eager else 'none'}")
+
+    failed = False
+    if eager:
+        print("FAIL: OAuth dependencies were imported at start-up")
+        failed = True
+    if args.max_ms is not None and statistics.median(total_ms) > args.max_ms:
+        print(f"FAIL: median start-up exceeds budget of {args.max_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
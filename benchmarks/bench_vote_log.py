@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Random access into the indexed vote log versus parsing a votes.json store.
+
+Writes --ballots synthetic ballots both as a votes.json file and as a vote
+log (votes.log + votes.idx) in a temporary directory, then times:
+  - loading one ballot by position and by vote id
+  - loading one export page of --page ballots
+  - counting ballots
+For votes.json each of these needs a full json.load of the file.
+
+Usage (from the project root):
+    python benchmarks/bench_vote_log.py [--ballots 200000] [--lookups 2000] [--page 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.vote_log import VoteLog
+
+
+def synthetic_votes(count, candidate_ids):
+    votes = []
+    for i in range(count):
+        selected = random.sample(candidate_ids, 15)
+        votes.append({
+            'id': str(uuid.uuid4()),
+            'voter_id': f"DEMO_USER_{i:08X}",
+            'selected_candidates': selected,
+            'executive_candidates': selected[:7],
+            'timestamp': '2024-01-01T00:00:00.000000Z'
+        })
+    return votes
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ballots', type=int, default=200000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--page', type=int, default=1000)
+    args = parser.parse_args()
+
+    votes = synthetic_votes(args.ballots, list(range(1, 43)))
+    ids = [vote['id'] for vote in votes]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'votes.json')
+        with open(json_path, 'w') as f:
+            json.dump({'voter_ids': [v['voter_id'] for v in votes], 'votes': votes}, f, indent=2)
+        log = VoteLog(os.path.join(tmp, 'votes.log'), os.path.join(tmp, 'votes.idx'))
+        start = time.perf_counter()
+        log.append(votes)
+        print(f"{args.ballots:,} ballots: votes.json {os.path.getsize(json_path) / 1e6:.1f} MB, "
+              f"log {os.path.getsize(log.log_path) / 1e6:.1f} MB + index {os.path.getsize(log.index_path) / 1e6:.1f} MB "
+              f"(written in {time.perf_counter() - start:.2f}s)")
+
+        def load_json():
+            with open(json_path) as f:
+                return json.load(f)
+        full_parse = per_call_us(load_json, 3)
+
+        def by_id():
+            assert log.read_by_id(random.choice(ids)) is not None
+
+        def page():
+            start = random.randrange(args.ballots)
+            return log.read_range(start, start + args.page)
+
+        log.position_of(ids[0])  # Build the id lookup once, as a long-running worker would
+        rows = [
+            ('count', per_call_us(lambda: len(log), args.lookups)),
+            ('read by position', per_call_us(lambda: log.read(random.randrange(args.ballots)), args.lookups)),
+            ('read by vote id', per_call_us(by_id, args.lookups)),
+            (f'page of {args.page}', per_call_us(page, max(1, args.lookups // 20))),
+        ]
+        print(f"{'operation':<20} {'vote log':>14} {'votes.json':>14}")
+        for name, us in rows:
+            print(f"{name:<20} {us:>11,.1f} us {full_parse:>11,.0f} us")
+
+
+if __name__ == '__main__':
+    main()
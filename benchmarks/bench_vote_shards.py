@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Submit throughput of the sharded vote store against shard and worker count.
+
+For every combination of --shards and --workers, each worker process commits
+--ballots ballots for distinct voters, twice:
+
+  store   ShardedVoteLog.append_unique alone (duplicate-voter check and fsync
+          under the voter's shard lock), in a temporary directory
+  submit  data_handler.append_vote, the full commit path of
+          /api/votes/submit, in a temporary election: the store append plus
+          the shared ballot counter and the Merkle ledger append, each under
+          its own election-wide lock (the ledger with its own fsync)
+
+Reports committed ballots per second for both; each run must end with every
+ballot present exactly once (and, for submit, in the ledger). The gap between
+the two columns is the cost of the election-wide steps, which shards do not
+spread out.
+
+Usage (from the project root):
+    python benchmarks/bench_vote_shards.py [--shards 1,2,4,8] [--workers 1,2,4,8] [--ballots 300]
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import shutil
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models import Election, Vote
+from backend.utils import data_handler
+from backend.utils.merkle import BallotLedger
+from backend.utils.vote_log import ShardedVoteLog
+
+
+def _ballots(worker, count):
+    candidate_ids = list(range(1, 43))
+    ballots = []
+    for i in range(count):
+        selected = random.sample(candidate_ids, 15)
+        ballots.append({
+            'id': str(uuid.uuid4()),
+            'voter_id': f"DEMO_USER_{worker:03X}{i:06X}",
+            'selected_candidates': selected,
+            'executive_candidates': selected[:7],
+            'timestamp': '2024-01-01T00:00:00.000000Z'
+        })
+    return ballots
+
+
+def _store_worker(folder, shards, worker, count, start_barrier):
+    store = ShardedVoteLog(folder, shards)
+    ballots = _ballots(worker, count)
+    start_barrier.wait()
+    for ballot in ballots:
+        store.append_unique(ballot)
+
+
+def _submit_worker(election_id, worker, count, start_barrier):
+    votes = [Vote(**ballot) for ballot in _ballots(worker, count)]
+    with contextlib.redirect_stdout(io.StringIO()):  # data_handler's debug prints
+        data_handler.get_vote_log(election_id)
+        data_handler.get_ballot_ledger(election_id)
+        start_barrier.wait()
+        for vote in votes:
+            data_handler.append_vote(vote, election_id)
+
+
+def _race(target, args, workers):
+    """Start the workers, release them together and return the elapsed seconds."""
+    barrier = multiprocessing.Barrier(workers + 1)
+    processes = [multiprocessing.Process(target=target, args=args(w) + (barrier,)) for w in range(workers)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start
+
+
+def run_store(shards, workers, count):
+    with tempfile.TemporaryDirectory() as folder:
+        ShardedVoteLog(folder, shards).close()  # Create the layout once, before the workers race
+        elapsed = _race(_store_worker, lambda w: (folder, shards, w, count), workers)
+        store = ShardedVoteLog(folder, shards)
+        committed = len(store)
+        distinct = len({vote['voter_id'] for vote in store})
+        store.close()
+    return committed, distinct, elapsed
+
+
+def run_submit(shards, workers, count):
+    election_id = f'bench-shards-{uuid.uuid4().hex[:8]}'
+    with contextlib.redirect_stdout(io.StringIO()):
+        data_handler.create_election(Election(election_id, 'Shard benchmark', 15, 7),
+                                     [{'id': cid, 'name': f'Candidate {cid}', 'position': '', 'photo': '',
+                                       'activity': 0, 'bio': ''} for cid in range(1, 43)], is_open=True)
+    folder = data_handler.get_election_folder(election_id)
+    try:
+        ShardedVoteLog(folder, shards).close()
+        elapsed = _race(_submit_worker, lambda w: (election_id, w, count), workers)
+        store = ShardedVoteLog(folder, shards)
+        committed = len(store)
+        distinct = len({vote['voter_id'] for vote in store})
+        store.close()
+        if BallotLedger(os.path.join(folder, 'ballot_hashes.log')).size != committed:
+            distinct = -1  # Reported as a mismatch
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return committed, distinct, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shards', default='1,2,4,8')
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--ballots', type=int, default=300, help='ballots per worker')
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} {'workers':>7} {'ballots':>8} {'store/s':>10} {'submit/s':>10}")
+    for shards in (int(s) for s in args.shards.split(',')):
+        for workers in (int(w) for w in args.workers.split(',')):
+            expected = workers * args.ballots
+            rates = []
+            ok = True
+            for run in (run_store, run_submit):
+                committed, distinct, elapsed = run(shards, workers, args.ballots)
+                ok = ok and committed == distinct == expected
+                rates.append(committed / elapsed)
+            print(f"{shards:>6} {workers:>7} {expected:>8} {rates[0]:>10,.0f} {rates[1]:>10,.0f}"
+                  f"{'' if ok else '  MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,41 @@
 // api.js - Handles all API calls to the Python backend
 
 const API_BASE_URL = '/api';
+// Election-scoped endpoints: ?election=<id> in the page URL selects an election
+// other than the default one
+const ELECTION_ID = new URLSearchParams(window.location.search).get('election');
+const ELECTION_API_URL = ELECTION_ID ? `${API_BASE_URL}/elections/${encodeURIComponent(ELECTION_ID)}` : API_BASE_URL;
+
+// Ballot submissions are retried (with the same Idempotency-Key) this many
+// times after a network error or a 409/503 answer
+const SUBMIT_RETRIES = 3;
+
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
 
 class ElectionAPI {
+    // --- Page load ---
+    // Candidates, session state and election status in one round-trip
+    static async bootstrap() {
+        const response = await fetch(`${ELECTION_API_URL}/bootstrap`);
+        if (!response.ok) {
+            throw new Error(`Bootstrap failed with status ${response.status}`);
+        }
+        return await response.json();
+    }
+
     // --- Vote API ---
     static async requestVoterID(email, phoneLast4) {
-        const response = await fetch(`${API_BASE_URL}/votes/request-id`, {
+        const response = await fetch(`${ELECTION_API_URL}/votes/request-id`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -17,14 +47,14 @@ class ElectionAPI {
     static async exportVotesToCSV() {
         // This function will primarily be called for its side effect (file download)
         // Returning the fetch promise allows the caller to handle potential errors during the initial request.
-        return fetch(`${API_BASE_URL}/admin/export-csv`, {
+        return fetch(`${ELECTION_API_URL}/admin/export-csv`, {
             method: 'GET',
             // credentials: 'include' // Uncomment if you need to send cookies/session
         });
         // Note: We don't parse JSON here because the response is expected to be a CSV file blob.
     }
     static async verifyVoterID(voterId) {
-        const response = await fetch(`${API_BASE_URL}/votes/verify-id`, {
+        const response = await fetch(`${ELECTION_API_URL}/votes/verify-id`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -34,20 +64,42 @@ class ElectionAPI {
         return await response.json();
     }
 
+    // Every attempt for one ballot carries the same Idempotency-Key, so the
+    // server counts it once and answers a retry with the stored response
     static async submitVote(selectedCandidates, executiveCandidates) {
-        const response = await fetch(`${API_BASE_URL}/votes/submit`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({ selectedCandidates, executiveCandidates })
-        });
-        return await response.json();
+        const idempotencyKey = newIdempotencyKey();
+        const body = JSON.stringify({ selectedCandidates, executiveCandidates });
+        for (let attempt = 0; ; attempt++) {
+            let response;
+            try {
+                response = await fetch(`${ELECTION_API_URL}/votes/submit`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'Idempotency-Key': idempotencyKey
+                    },
+                    body
+                });
+            } catch (error) {
+                // Network error: the ballot may or may not have been recorded
+                if (attempt >= SUBMIT_RETRIES) {
+                    throw error;
+                }
+                await sleep(500 * 2 ** attempt);
+                continue;
+            }
+            if ((response.status === 409 || response.status === 503) && attempt < SUBMIT_RETRIES) {
+                const retryAfter = Number(response.headers.get('Retry-After')) || 1;
+                await sleep(Math.min(retryAfter, 10) * 1000);
+                continue;
+            }
+            return await response.json();
+        }
     }
 
     // --- Results API ---
     static async getResults() {
-        const response = await fetch(`${API_BASE_URL}/results`);
+        const response = await fetch(`${ELECTION_API_URL}/results`);
         return await response.json();
     }
 
@@ -64,12 +116,12 @@ class ElectionAPI {
     }
 
     static async getElectionStatus() {
-        const response = await fetch(`${API_BASE_URL}/admin/status`);
+        const response = await fetch(`${ELECTION_API_URL}/admin/status`);
         return await response.json();
     }
 
     static async toggleElectionStatus() {
-        const response = await fetch(`${API_BASE_URL}/admin/toggle`, {
+        const response = await fetch(`${ELECTION_API_URL}/admin/toggle`, {
             method: 'POST'
         });
         return await response.json();
@@ -78,7 +130,7 @@ class ElectionAPI {
     static async exportVotes() {
         // This would typically be a direct link or a more complex download
         // For now, we'll fetch the data and log it
-        const response = await fetch(`${API_BASE_URL}/admin/export`);
+        const response = await fetch(`${ELECTION_API_URL}/admin/export`);
         const data = await response.json();
         console.log('Exported votes:', data);
         // In a real app, you might create a downloadable file
@@ -3,8 +3,8 @@
 // State management
 let selectedCandidates = [];
 let executiveCandidates = [];
-const maxSelections = 15;
-const maxExecutives = 7;
+let maxSelections = 15; // Per-election ballot rules, updated from /api/bootstrap
+let maxExecutives = 7;
 let activeDetails = null;
 let electionOpen = true; // This will be updated by the backend
 let currentChart = null;
@@ -630,29 +630,51 @@ async function demoAuth() {
     }
 }
 
+// Show the voting step for an authenticated session (data from /api/auth/session or /api/bootstrap).
+// Only called on the sign-in redirect (?authenticated=true), like the original checkAuthStatus.
+function applySession(data) {
+    if (data && data.authenticated && data.hasVoted) {
+        // Sign-in no longer checks this; each election does
+        showMessage('You have already voted in this election', 'error');
+        return;
+    }
+    if (data && data.authenticated) {
+        currentUser = data.user;
+        // Show step 3 if authenticated
+        document.getElementById('step1').classList.add('hidden');
+        document.getElementById('step2').classList.add('hidden');
+        document.getElementById('step3').classList.remove('hidden');
+        document.getElementById('confirmedUserName').textContent = currentUser.name;
+        initCandidates();
+        updateUI();
+        showMessage('Welcome back! You are authenticated.', 'success');
+    }
+}
+
 // Check authentication status on page load
 async function checkAuthStatus() {
     try {
         const response = await fetch('/api/auth/session');
         if (response.ok) {
-            const data = await response.json();
-            if (data.authenticated) {
-                currentUser = data.user;
-                // Show step 3 if authenticated
-                document.getElementById('step1').classList.add('hidden');
-                document.getElementById('step2').classList.add('hidden');
-                document.getElementById('step3').classList.remove('hidden');
-                document.getElementById('confirmedUserName').textContent = currentUser.name;
-                initCandidates();
-                updateUI();
-                showMessage('Welcome back! You are authenticated.', 'success');
-            }
+            applySession(await response.json());
         }
     } catch (err) {
         console.log('Not authenticated or error checking auth status');
     }
 }
 
+// Update the election status banner
+function applyElectionStatus(isOpen) {
+    electionOpen = isOpen;
+    // Update election status display
+    if (!electionOpen) {
+        electionStatus.innerHTML = '<i class="fas fa-lock-open"></i> Election is closed';
+        electionStatus.classList.add('closed');
+        document.getElementById('electionClosedMessage').classList.remove('hidden');
+        document.getElementById('step1').classList.add('disabled');
+    }
+}
+
 // Proceed to voting after authentication
 function proceedToVoting() {
     document.getElementById('step2').classList.add('hidden');
@@ -679,12 +701,14 @@ async function logout() {
     }
 }
 
+// Whether this page load is the redirect back from Google OAuth2
+function isAuthCallback() {
+    return new URLSearchParams(window.location.search).get('authenticated') === 'true';
+}
+
 // Handle authentication callback from Google OAuth2
 function handleAuthCallback() {
-    const urlParams = new URLSearchParams(window.location.search);
-    const authenticated = urlParams.get('authenticated');
-
-    if (authenticated === 'true') {
+    if (isAuthCallback()) {
         // User was redirected back from Google OAuth2
         checkAuthStatus();
     }
@@ -941,25 +965,30 @@ const UIController = {
 
 document.addEventListener('DOMContentLoaded', async function() {
     console.log('Phoenix Council Elections frontend initialized');
-    loadCandidates(); // Initiates the fetch of candidate data
-
-    // Check for authentication callback
-    handleAuthCallback();
 
     // Initial UI setup
-    // Fetch initial election status
+    // Candidates, session and election status arrive in a single request
     try {
-        const statusResponse = await ElectionAPI.getElectionStatus();
-        electionOpen = statusResponse.is_open;
-        // Update election status display
-        if (!electionOpen) {
-            electionStatus.innerHTML = '<i class="fas fa-lock-open"></i> Election is closed';
-            electionStatus.classList.add('closed');
-            document.getElementById('electionClosedMessage').classList.remove('hidden');
-            document.getElementById('step1').classList.add('disabled');
+        const bootstrap = await ElectionAPI.bootstrap();
+        maxSelections = bootstrap.election.maxSelections || maxSelections;
+        maxExecutives = bootstrap.election.maxExecutives || maxExecutives;
+        showCandidates(bootstrap.candidates);
+        applyElectionStatus(bootstrap.election.isOpen);
+        // The session is already in the bootstrap response; use it only on the sign-in redirect
+        if (isAuthCallback()) {
+            applySession(bootstrap.session);
         }
     } catch (err) {
-        console.error('Error fetching initial election status:', err);
+        console.error('Error loading bootstrap data, falling back to separate requests:', err);
+        loadCandidates(); // Initiates the fetch of candidate data
+        // Check for authentication callback
+        handleAuthCallback();
+        try {
+            const statusResponse = await ElectionAPI.getElectionStatus();
+            applyElectionStatus(statusResponse.is_open);
+        } catch (statusErr) {
+            console.error('Error fetching initial election status:', statusErr);
+        }
     }
 
     // Tab switching
@@ -1029,27 +1058,13 @@ async function loadCandidates() {
 
     try {
         // --- FETCH DATA FROM BACKEND ---
-        const response = await fetch('/api/candidates');
+        const response = await fetch(`${ELECTION_API_URL}/candidates`);
 
         if (!response.ok) {
             throw new Error(`Backend returned error ${response.status}: ${response.statusText}`);
         }
 
-        const candidatesData = await response.json();
-
-        if (!Array.isArray(candidatesData)) {
-             throw new Error("Received candidate data is not in the expected array format.");
-        }
-
-        // --- SUCCESSFULLY LOADED ---
-        candidates = candidatesData; // Assign fetched data to the global variable
-        console.log("Candidates successfully loaded from backend:", candidates);
-
-        // --- INITIALIZE UI DEPENDENT ON CANDIDATES ---
-        // These functions now use the populated `candidates` array
-        initCandidates();
-        updateUI(); // Update counters, button states based on (initially empty) selections
-        displayInfoCandidates(); // Populate the Info tab candidate list
+        showCandidates(await response.json());
     } catch (error) {
         // --- HANDLE ERRORS ---
         console.error("Error loading candidates from backend:", error);
@@ -1068,6 +1083,26 @@ async function loadCandidates() {
 }
 // --- END NEW FUNCTION ---
 
+/**
+ * Stores the candidate list (from /api/candidates or /api/bootstrap) and renders it.
+ * Throws if the data is not an array.
+ */
+function showCandidates(candidatesData) {
+    if (!Array.isArray(candidatesData)) {
+         throw new Error("Received candidate data is not in the expected array format.");
+    }
+
+    // --- SUCCESSFULLY LOADED ---
+    candidates = candidatesData; // Assign fetched data to the global variable
+    console.log("Candidates successfully loaded from backend:", candidates);
+
+    // --- INITIALIZE UI DEPENDENT ON CANDIDATES ---
+    // These functions now use the populated `candidates` array
+    initCandidates();
+    updateUI(); // Update counters, button states based on (initially empty) selections
+    displayInfoCandidates(); // Populate the Info tab candidate list
+}
+
 // --- NEW FUNCTION: Populate Info Tab Candidates ---
 /**
  * Populates the "Meet the Candidates" section in the Info tab with expandable cards.
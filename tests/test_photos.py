@@ -0,0 +1,143 @@
+# tests/test_photos.py
+# PhotoCache against small images generated into a temporary directory and
+# read through file:// URLs, so nothing touches the network.
+#   python -m pytest tests
+import os
+
+import pytest
+from werkzeug.datastructures import MIMEAccept
+
+Image = pytest.importorskip('PIL.Image')
+
+from backend.utils.photos import PhotoCache
+
+SIZE = 32
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """A landscape JPEG and a portrait PNG with transparency, as file:// URLs."""
+    folder = tmp_path / 'sources'
+    folder.mkdir()
+    jpeg = folder / 'landscape.jpg'
+    Image.new('RGB', (120, 80), (200, 40, 40)).save(jpeg, 'JPEG')
+    png = folder / 'portrait.png'
+    Image.new('RGBA', (50, 90), (40, 40, 200, 128)).save(png, 'PNG')
+    return {'jpeg': jpeg.as_uri(), 'png': png.as_uri()}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PhotoCache(str(tmp_path / 'photos'), size=SIZE)
+
+
+def accept(*mimetypes):
+    return MIMEAccept([(mimetype, 1) for mimetype in mimetypes])
+
+
+@pytest.mark.parametrize('source', ['jpeg', 'png'])
+def test_ingest_writes_square_thumbnail_in_every_format(cache, sources, source):
+    assert cache.ingest(sources[source])
+    key = cache.key_for(sources[source])
+    assert cache.formats, 'JPEG is always available'
+    for fmt, ext, _ in cache.formats:
+        with Image.open(os.path.join(cache.cache_dir, key + ext)) as thumbnail:
+            assert thumbnail.format == fmt
+            assert thumbnail.size == (SIZE, SIZE)
+            assert thumbnail.mode == 'RGB'
+
+
+def test_ingest_fetches_each_url_once(tmp_path, sources):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        with open(url[len('file://'):], 'rb') as f:
+            return f.read()
+
+    cache = PhotoCache(str(tmp_path / 'photos'), size=SIZE, fetch=fetch)
+    assert cache.ingest(sources['jpeg'])
+    assert cache.ingest(sources['jpeg'])
+    assert fetched == [sources['jpeg']]
+
+
+def test_ingest_failure_is_not_cached(cache, tmp_path):
+    missing = (tmp_path / 'missing.jpg').as_uri()
+    assert not cache.ingest(missing)
+    assert cache.local_url(missing) is None
+
+
+def test_local_url_only_after_ingest(cache, sources):
+    url = sources['jpeg']
+    assert cache.local_url(url) is None
+    assert cache.local_url('') is None
+    cache.ingest(url)
+    assert cache.local_url(url) == f"/photos/{cache.key_for(url)}"
+    assert cache.source_url(cache.key_for(url)) == url
+
+
+def test_key_depends_on_size(tmp_path, sources):
+    small = PhotoCache(str(tmp_path / 'small'), size=16)
+    large = PhotoCache(str(tmp_path / 'large'), size=64)
+    assert small.key_for(sources['jpeg']) != large.key_for(sources['jpeg'])
+
+
+def test_resolve_prefers_webp_when_accepted(cache, sources):
+    if not any(fmt == 'WEBP' for fmt, _, _ in cache.formats):
+        pytest.skip('Pillow built without WebP support')
+    cache.ingest(sources['png'])
+    key = cache.key_for(sources['png'])
+    path, mimetype = cache.resolve(key, accept('image/webp', 'image/*'))
+    assert mimetype == 'image/webp'
+    assert path.endswith('.webp')
+
+
+def test_resolve_falls_back_to_jpeg(cache, sources):
+    cache.ingest(sources['png'])
+    key = cache.key_for(sources['png'])
+    for accepted in (accept('image/jpeg'), accept('image/png'), MIMEAccept()):
+        path, mimetype = cache.resolve(key, accepted)
+        assert mimetype == 'image/jpeg'
+        assert path.endswith('.jpg')
+
+
+def test_resolve_unknown_key(cache):
+    assert cache.resolve('0' * 20, accept('image/webp')) is None
+
+
+def test_eviction_removes_least_recently_served(tmp_path):
+    # Three copies of one image, so every photo takes the same space
+    urls = []
+    for i in range(3):
+        path = tmp_path / f'copy{i}.jpg'
+        Image.new('RGB', (120, 80), (40, 160, 40)).save(path, 'JPEG')
+        urls.append(path.as_uri())
+    probe = PhotoCache(str(tmp_path / 'probe'), size=SIZE)
+    probe.ingest(urls[0])
+    photo_bytes = probe.disk_usage()
+
+    cache = PhotoCache(str(tmp_path / 'photos'), size=SIZE, max_bytes=2 * photo_bytes)
+    first, second, third = urls
+    cache.ingest(first)
+    cache.ingest(second)
+    assert cache.disk_usage() == 2 * photo_bytes
+    # Age both, then serve the first so the second is the least recently used
+    for url in (first, second):
+        for _, ext, _ in cache.formats:
+            os.utime(os.path.join(cache.cache_dir, cache.key_for(url) + ext), (1000, 1000))
+    assert cache.resolve(cache.key_for(first), accept('image/jpeg')) is not None
+    generation = cache.generation
+
+    assert cache.ingest(third)
+    assert cache.disk_usage() <= cache.max_bytes
+    assert cache.local_url(first) is not None
+    assert cache.local_url(second) is None
+    assert cache.local_url(third) is not None
+    assert cache.generation > generation
+
+
+def test_evict_is_a_no_op_under_the_limit(cache, sources):
+    cache.ingest(sources['jpeg'])
+    cache.ingest(sources['png'])
+    assert cache.evict() == 0
+    assert cache.is_cached(sources['jpeg']) and cache.is_cached(sources['png'])
@@ -0,0 +1,45 @@
+# tests/test_vote_log.py
+# Crash recovery of the append-only vote log.
+#   python -m pytest tests
+from backend.utils.vote_log import VoteLog
+
+
+def ballot(i):
+    return {
+        'id': f'id{i}', 'voter_id': f'voter{i}', 'selected_candidates': [1, 2],
+        'executive_candidates': [1], 'timestamp': f'2024-01-01T00:00:0{i}Z'
+    }
+
+
+def make_log(tmp_path):
+    return VoteLog(str(tmp_path / 'votes.log'), str(tmp_path / 'votes.idx'))
+
+
+def test_torn_index_record_is_dropped_before_the_next_append(tmp_path):
+    log = make_log(tmp_path)
+    log.append([ballot(0)])
+    # A writer killed after writing its log line and part of its index record
+    torn = ballot(1)
+    lines, records = log._encode([torn], log._committed_end())
+    with open(log.log_path, 'ab') as f:
+        f.write(lines)
+    with open(log.index_path, 'ab') as f:
+        f.write(records[:10])
+    assert len(log) == 1
+
+    log.append_unique(ballot(2))
+    reopened = make_log(tmp_path)
+    for store in (log, reopened):
+        assert [vote['id'] for vote in store] == ['id0', 'id2']
+        assert store.read_by_id('id2') == ballot(2)
+        assert store.read_by_id('id1') is None
+        assert 'voter2' in store.voter_ids()
+
+
+def test_uncommitted_log_tail_is_dropped(tmp_path):
+    log = make_log(tmp_path)
+    log.append([ballot(0)])
+    with open(log.log_path, 'ab') as f:
+        f.write(b'{"id":"half')
+    log.append([ballot(1)])
+    assert [vote['id'] for vote in make_log(tmp_path)] == ['id0', 'id1']
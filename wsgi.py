@@ -7,11 +7,11 @@ This file is used by PythonAnywhere to serve the Flask application
 import sys
 import os
 
-# Add the backend directory to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+# Add the project root to Python path so the backend package can be imported
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import the Flask app
-from app import create_app
+from backend.app import create_app
 
 # Create the application instance
 application = create_app('production')